@@ -62,6 +62,7 @@ class FJobOffers(models.Model):
     salary_min = models.FloatField(blank=True, null=True)
     salary_max = models.FloatField(blank=True, null=True)
     salary_avg = models.FloatField(blank=True, null=True)
+    canonical_offer_id = models.CharField(max_length=64, blank=True, null=True)
 
     class Meta:
         managed = False
@@ -98,6 +99,7 @@ class FSurveyResponses(models.Model):
     id_country = models.IntegerField(blank=True, null=True)
     id_skill = models.IntegerField(blank=True, null=True)
     id_source = models.IntegerField(blank=True, null=True)
+    survey_year = models.IntegerField(blank=True, null=True)
     salary = models.FloatField(blank=True, null=True)
     experience_years = models.IntegerField(blank=True, null=True)
     dev_type = models.TextField(blank=True, null=True)
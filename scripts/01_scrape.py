@@ -5,83 +5,824 @@
 
 import os
 import json
+import math
+import hashlib
+import gzip
 import requests
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit, urlencode
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
 from pytrends.request import TrendReq
 import time
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from loguru import logger
 from dotenv import load_dotenv
 import zipfile
+import pyarrow as pa
+import pyarrow.parquet as pq
 from jobspy import scrape_jobs
+from jobspy.linkedin import LinkedIn
+from jobspy.model import DescriptionFormat, ScraperInput, SalarySource
 
 load_dotenv()
 
-RAW_DATA_DIR = "raw"
+RAW_DATA_DIR = os.getenv("RAW_DATA_DIR", "raw")
 os.makedirs(RAW_DATA_DIR, exist_ok=True)
 
 logger.remove()
 logger.add(f"{RAW_DATA_DIR}/scraping.log", level="INFO", rotation="1 day")
 
+# Mode de collecte : "concurrent" (sources en parallèle) ou "sequential"
+SCRAPE_MODE = os.getenv("SCRAPE_MODE", "concurrent")
+
+# Concurrence et débit autorisé (requêtes/s, rafale) par source
+SOURCES_CONFIG = {
+    "adzuna": {
+        "workers": int(os.getenv("ADZUNA_WORKERS", 4)),
+        "rate": float(os.getenv("ADZUNA_RATE", 1.0)),
+        "burst": 2,
+    },
+    "github": {
+        "workers": int(os.getenv("GITHUB_WORKERS", 3)),
+        "rate": float(os.getenv("GITHUB_RATE", 0.5)),
+        "burst": 5,
+    },
+    "google_trends": {
+        "workers": int(os.getenv("TRENDS_WORKERS", 1)),
+        "rate": float(os.getenv("TRENDS_RATE", 0.05)),
+        "burst": 1,
+    },
+    "stackoverflow": {"workers": 1, "rate": 1.0, "burst": 1},
+    "jobspy": {
+        "workers": int(os.getenv("JOBSPY_WORKERS", 3)),
+        "rate": float(os.getenv("JOBSPY_RATE", 0.2)),
+        "burst": 2,
+    },
+    # Pages de détail LinkedIn (descriptions), récupérées hors JobSpy
+    "linkedin": {
+        "workers": int(os.getenv("LINKEDIN_WORKERS", 4)),
+        "rate": float(os.getenv("LINKEDIN_RATE", 1.0)),
+        "burst": 2,
+    },
+}
+
+ADZUNA_BASE_URL = os.getenv("ADZUNA_BASE_URL", "https://api.adzuna.com/v1/api/jobs")
+ADZUNA_MAX_PAGES = int(os.getenv("ADZUNA_MAX_PAGES", 10))
+ADZUNA_RESULTS_PER_PAGE = 50
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+GITHUB_CREATED_SINCE = os.getenv("GITHUB_CREATED_SINCE", "2024-01-01")
+GITHUB_MIN_STARS = int(os.getenv("GITHUB_MIN_STARS", 50))
+GITHUB_PER_PAGE = 100
+GITHUB_SEARCH_CAP = 1000  # résultats maximum renvoyés par requête de recherche
+# Bornes de shards arrondies au jour : les requêtes d'une exécution à l'autre
+# (et donc les clés du cache HTTP) se répètent
+GITHUB_MIN_SHARD = timedelta(days=1)
+
+SO_SURVEY_URL = "https://survey.stackoverflow.co/datasets/stack-overflow-developer-survey-{year}.zip"
+SO_SURVEY_YEARS = [
+    year.strip() for year in os.getenv("SO_SURVEY_YEARS", "2024").split(",") if year.strip()
+]
+SO_SURVEY_CHUNK_ROWS = 20000
+
+# Colonnes du survey conservées (les ~100 autres ne sont jamais lues) et leur type
+SO_SURVEY_SCHEMA = pa.schema([
+    ("ResponseId", pa.int64()),
+    ("SurveyYear", pa.int16()),
+    ("Country", pa.string()),
+    ("LanguageHaveWorkedWith", pa.string()),
+    ("CompTotal", pa.float64()),
+    ("Currency", pa.string()),
+    ("DevType", pa.string()),
+    ("YearsCodePro", pa.string()),
+    ("Employment", pa.string()),
+    ("EdLevel", pa.string()),
+])
+# Noms de colonnes des éditions précédentes
+SO_SURVEY_ALIASES = {"Respondent": "ResponseId", "LanguageWorkedWith": "LanguageHaveWorkedWith"}
+
+
+# Google Trends : 5 mots-clés maximum par payload, dont un mot-clé d'ancrage
+# commun à tous les lots pour rendre les valeurs comparables entre lots
+TRENDS_ANCHOR = os.getenv("TRENDS_ANCHOR", "Python")
+TRENDS_BATCH_SIZE = 5
+TRENDS_TIMEFRAME = "today 3-m"
+SKILLS_DIM_PATH = os.getenv("SKILLS_DIM_PATH", "datasets_clean/dim_skills.csv")
+DEFAULT_TREND_KEYWORDS = ["Python", "JavaScript", "React", "Go", "Rust", "Data Science"]
+
+# États persistants entre deux exécutions (watermarks, checkpoints...)
+STATE_DIR = f"{RAW_DATA_DIR}/.state"
+# Au-delà, un checkpoint laissé par une exécution en échec est ignoré : nouvelle collecte
+CHECKPOINT_MAX_AGE = timedelta(hours=float(os.getenv("SCRAPE_CHECKPOINT_MAX_AGE_HOURS", 12)))
+
+# Fichiers bruts NDJSON compressés en gzip
+RAW_COMPRESS = os.getenv("RAW_COMPRESS", "0") == "1"
+
+# Cache HTTP disque : "on", "off" ou "replay" (hors ligne, réponses enregistrées uniquement)
+HTTP_CACHE_MODE = os.getenv("HTTP_CACHE_MODE", "on")
+HTTP_CACHE_DIR = f"{RAW_DATA_DIR}/.http_cache"
+HTTP_CACHE_TTL = int(os.getenv("HTTP_CACHE_TTL", 6 * 3600))
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_MB", 512)) * 1024 * 1024
+
+MAX_RETRIES = int(os.getenv("SCRAPE_MAX_RETRIES", 5))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RateLimiter:
+    """Token bucket partagé par les workers d'une source.
+
+    Le débit nominal est fixé par (rate, burst) ; les en-têtes Retry-After et
+    X-RateLimit-* suspendent la source exactement le temps demandé par le
+    fournisseur, sinon on recule avec un délai exponentiel aléatoire.
+    """
+
+    def __init__(self, name, rate, burst=1, base_backoff=2.0, max_backoff=300.0):
+        self.name = name
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Bloque jusqu'à obtenir un jeton"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                else:
+                    self.tokens = min(
+                        self.capacity, self.tokens + (now - self.updated) * self.rate
+                    )
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def block_for(self, seconds):
+        """Suspend toute la source pendant `seconds`"""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            # Le seau repart vide à la fin de la pause : pas de rafale juste après
+            self.tokens = 0.0
+            self.updated = self.blocked_until
+
+    def backoff_delay(self, attempt):
+        """Délai exponentiel avec jitter complet"""
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+
+    def wait_from_headers(self, headers):
+        """Temps d'attente imposé par le fournisseur, ou None"""
+        retry_after = headers.get("Retry-After")
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                try:
+                    retry_at = parsedate_to_datetime(retry_after)
+                    return max(0.0, retry_at.timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining is not None and reset is not None:
+            try:
+                if int(remaining) == 0:
+                    return max(0.0, float(reset) - time.time()) + 1
+            except ValueError:
+                pass
+        return None
 
-def scrape_google_trends():
-    """Collecte les tendances Google avec une initialisation Pytrends corrigée."""
-    logger.info("Démarrage Google Trends")
-    trends_data = []
 
+RATE_LIMITERS = {
+    name: RateLimiter(name, config["rate"], config["burst"])
+    for name, config in SOURCES_CONFIG.items()
+}
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(url):
+    """Session keep-alive partagée par hôte (une poignée TLS par connexion du pool)"""
+    host = urlsplit(url).netloc
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            pool_size = max(config["workers"] for config in SOURCES_CONFIG.values())
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[host] = session
+    return session
+
+
+def request_with_retry(source, method, url, session=None, **kwargs):
+    """Requête HTTP soumise au limiteur de la source, avec reprise sur 429/5xx"""
+    limiter = RATE_LIMITERS[source]
+    client = session or get_session(url)
+
+    for attempt in range(MAX_RETRIES + 1):
+        limiter.acquire()
+        try:
+            response = client.request(method, url, **kwargs)
+        except requests.RequestException as e:
+            if attempt == MAX_RETRIES:
+                raise
+            delay = limiter.backoff_delay(attempt)
+            logger.warning(f"{source}: erreur réseau ({e}), nouvel essai dans {delay:.1f}s")
+            time.sleep(delay)
+            continue
+
+        wait = limiter.wait_from_headers(response.headers)
+        rate_limited = response.status_code in RETRY_STATUSES or (
+            response.status_code == 403 and wait is not None
+        )
+        if not rate_limited:
+            if wait:
+                # Quota épuisé mais réponse valide : on attend le reset avant la suivante
+                limiter.block_for(wait)
+            return response
+
+        if attempt == MAX_RETRIES:
+            return response
+        delay = wait if wait is not None else limiter.backoff_delay(attempt)
+        logger.warning(
+            f"{source}: HTTP {response.status_code}, pause de {delay:.1f}s "
+            f"(essai {attempt + 1}/{MAX_RETRIES})"
+        )
+        limiter.block_for(delay)
+
+    return response
+
+
+def load_state(name, default):
+    """Lit un état persistant JSON de STATE_DIR"""
     try:
-        pytrends = TrendReq(timeout=(10, 25))
-        keywords = ["Python", "JavaScript", "React", "Go", "Rust", "Data Science"]
+        with open(f"{STATE_DIR}/{name}.json", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def save_state(name, data):
+    """Écrit un état persistant JSON de manière atomique"""
+    os.makedirs(STATE_DIR, exist_ok=True)
+    path = f"{STATE_DIR}/{name}.json"
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(f"{path}.tmp", path)
+
+
+class NdjsonWriter:
+    """Écriture append-only d'enregistrements NDJSON (gzip optionnel), partagée entre workers"""
+
+    def __init__(self, name, truncate=False):
+        self.path = f"{RAW_DATA_DIR}/{name}.ndjson" + (".gz" if RAW_COMPRESS else "")
+        opener = gzip.open if RAW_COMPRESS else open
+        self.file = opener(self.path, "wt" if truncate else "at", encoding="utf-8")
+        self.lock = threading.Lock()
+        self.count = 0
+
+    def write(self, records):
+        lines = "".join(
+            json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in records
+        )
+        with self.lock:
+            self.file.write(lines)
+            self.file.flush()
+            self.count += len(records)
+
+    def close(self):
+        self.file.close()
+
+
+class Checkpoint:
+    """Unités de collecte terminées d'une source, persistées ligne par ligne.
+
+    Une unité est un tuple (pays, requête, page...) associé à un petit résultat
+    (nombre d'offres, total annoncé) qui permet de replanifier une reprise sans
+    refaire la requête. Le checkpoint est daté ; au-delà de CHECKPOINT_MAX_AGE
+    il est abandonné, pour qu'une unité toujours en échec ne fige pas la source.
+    """
+
+    def __init__(self, source):
+        self.path = f"{STATE_DIR}/{source}.checkpoint"
+        self.units = {}
+        self.lock = threading.Lock()
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        unit, info = json.loads(line)
+                    except ValueError:
+                        continue  # dernière ligne tronquée par un arrêt brutal
+                    self.units[json.dumps(unit)] = info
+        except OSError:
+            pass
+        started_at = self.get("started_at")
+        if self.units and not (
+            started_at
+            and datetime.now(timezone.utc) - datetime.fromisoformat(started_at) < CHECKPOINT_MAX_AGE
+        ):
+            logger.warning(f"{source}: checkpoint du {started_at or '?'} expiré, nouvelle collecte")
+            self.clear()
+            self.units = {}
+        self.resumed = bool(self.units)
+        if not self.resumed:
+            self.mark("started_at", info=datetime.now(timezone.utc).isoformat())
+
+    def get(self, *unit):
+        return self.units.get(json.dumps(list(unit), default=str))
+
+    def mark(self, *unit, info=True):
+        key = json.dumps(list(unit), default=str)
+        with self.lock:
+            os.makedirs(STATE_DIR, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps([json.loads(key), info]) + "\n")
+            self.units[key] = info
+
+    def clear(self):
+        """Collecte complète : la prochaine exécution repart de zéro"""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def open_collection(source, *names):
+    """Checkpoint de la source et ses fichiers NDJSON.
+
+    Les fichiers sont tronqués pour une nouvelle collecte, complétés en reprise.
+    """
+    checkpoint = Checkpoint(source)
+    if checkpoint.resumed:
+        logger.info(f"{source}: reprise, {len(checkpoint.units) - 1} unités déjà collectées")
+    writers = [NdjsonWriter(name, truncate=not checkpoint.resumed) for name in names]
+    return checkpoint, writers
+
+
+def close_collection(source, checkpoint, writers, failures):
+    """Ferme les fichiers ; le checkpoint n'est effacé que si tout a été collecté"""
+    for writer in writers:
+        writer.close()
+    if failures:
+        logger.warning(f"{source}: {failures} unités en échec, checkpoint conservé pour reprise")
+    else:
+        checkpoint.clear()
+
+
+class SeenIds:
+    """IDs d'offres déjà collectés, persistés d'une exécution à l'autre (un ID par ligne)"""
+
+    def __init__(self, name):
+        self.path = f"{STATE_DIR}/{name}.txt"
+        self.lock = threading.Lock()
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.ids = {line.strip() for line in f if line.strip()}
+        except OSError:
+            self.ids = set()
+
+    def claim(self, ids):
+        """Réserve les IDs inconnus ; renvoie pour chaque ID s'il est nouveau"""
+        with self.lock:
+            new = []
+            for job_id in ids:
+                new.append(job_id not in self.ids)
+                self.ids.add(job_id)
+            return new
+
+    def release(self, ids):
+        """Rend les IDs réservés dont la collecte a échoué (retentés au prochain run)"""
+        with self.lock:
+            self.ids.difference_update(ids)
+
+    def persist(self, ids):
+        if not ids:
+            return
+        with self.lock:
+            os.makedirs(STATE_DIR, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(f"{job_id}\n" for job_id in ids))
+
+
+class CacheMiss(Exception):
+    """Réponse absente du cache en mode replay"""
+
+
+class HttpCache:
+    """Cache disque des réponses HTTP, indexé par URL + paramètres.
+
+    Chaque entrée garde ses validateurs (ETag, Last-Modified) pour les requêtes
+    conditionnelles ; au-delà du TTL elle est revalidée, et le cache est borné
+    en taille par éviction LRU. Une entrée peut aussi ne porter que des
+    métadonnées et pointer vers un fichier produit ailleurs (archive du survey).
+    """
+
+    def __init__(self, directory, ttl, max_bytes):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(directory, "index.json")
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    @staticmethod
+    def key(url, params=None):
+        query = urlencode(sorted((params or {}).items()))
+        return hashlib.sha256(f"{url}?{query}".encode("utf-8")).hexdigest()
+
+    def _body_path(self, key):
+        return os.path.join(self.directory, f"{key}.body")
+
+    def get(self, key):
+        """Entrée du cache, ou None si absente ou si son contenu a disparu"""
+        with self.lock:
+            entry = self.index.get(key)
+        if entry is None:
+            return None
+        path = entry.get("file") or self._body_path(key)
+        return entry if os.path.exists(path) else None
+
+    def is_fresh(self, entry):
+        return time.time() - entry["stored_at"] < self.ttl
+
+    def read(self, key):
+        with open(self._body_path(key), "rb") as f:
+            content = f.read()
+        with self.lock:
+            self.index[key]["last_access"] = time.time()
+        return content
+
+    def put(self, key, url, response):
+        """Enregistre le corps d'une réponse 200"""
+        path = self._body_path(key)
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(response.content)
+        os.replace(f"{path}.tmp", path)
+        self._store(key, url, response.headers, size=len(response.content))
 
-        for keyword in keywords:
+    def put_meta(self, key, url, headers, file_path):
+        """Enregistre uniquement les validateurs d'un contenu stocké dans file_path"""
+        self._store(key, url, headers, size=0, file=file_path)
+
+    def refresh(self, key, headers):
+        """Revalidation 304 : l'entrée repart pour un TTL complet"""
+        with self.lock:
+            entry = self.index[key]
+            entry["stored_at"] = entry["last_access"] = time.time()
+            entry["etag"] = headers.get("ETag") or entry.get("etag")
+            entry["last_modified"] = headers.get("Last-Modified") or entry.get("last_modified")
+            self._save()
+
+    def _store(self, key, url, headers, size, file=None):
+        now = time.time()
+        with self.lock:
+            self.index[key] = {
+                "url": url,
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "content_type": headers.get("Content-Type"),
+                "size": size,
+                "file": file,
+                "stored_at": now,
+                "last_access": now,
+            }
+            self._evict()
+            self._save()
+
+    def _evict(self):
+        total = sum(entry["size"] for entry in self.index.values())
+        for key, entry in sorted(self.index.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            if entry.get("file"):
+                continue
+            total -= entry["size"]
+            del self.index[key]
             try:
-                logger.info(f"Collecte de la tendance pour : '{keyword}'")
-                pytrends.build_payload(
-                    [keyword], cat=0, timeframe="today 3-m", geo="", gprop=""
-                )
-                interest_over_time_df = pytrends.interest_over_time()
-
-                if (
-                    not interest_over_time_df.empty
-                    and not interest_over_time_df[keyword].empty
-                ):
-                    interest = interest_over_time_df[keyword].to_dict()
-                    trends_data.append(
-                        {
-                            "source": "google_trends",
-                            "keyword": keyword,
-                            "interest_over_time": {
-                                str(k.date()): v for k, v in interest.items()
-                            },
-                            "scraped_at": datetime.now().isoformat(),
-                        }
-                    )
-                    logger.info(f"Tendance pour '{keyword}' collectée.")
-                else:
-                    logger.warning(f"Aucune donnée de tendance pour '{keyword}'.")
+                os.remove(self._body_path(key))
+            except OSError:
+                pass
+
+    def _save(self):
+        with open(f"{self.index_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        os.replace(f"{self.index_path}.tmp", self.index_path)
 
-                time.sleep(random.randint(20, 35))
 
+HTTP_CACHE = HttpCache(HTTP_CACHE_DIR, HTTP_CACHE_TTL, HTTP_CACHE_MAX_BYTES)
+
+
+def conditional_headers(entry, headers=None):
+    """Ajoute If-None-Match / If-Modified-Since à partir d'une entrée du cache"""
+    headers = dict(headers or {})
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def _cached_response(url, entry, content):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = content
+    response.headers = CaseInsensitiveDict(
+        {"Content-Type": entry.get("content_type") or "application/json", "X-Cache": "HIT"}
+    )
+    response.url = url
+    response.encoding = "utf-8"
+    return response
+
+
+def http_get(source, url, params=None, headers=None, **kwargs):
+    """GET servi par le cache disque si possible, sinon revalidé auprès du fournisseur"""
+    if HTTP_CACHE_MODE == "off":
+        return request_with_retry(
+            source, "GET", url, params=params, headers=headers, **kwargs
+        )
+
+    key = HttpCache.key(url, params)
+    entry = HTTP_CACHE.get(key)
+    if entry and (HTTP_CACHE_MODE == "replay" or HTTP_CACHE.is_fresh(entry)):
+        return _cached_response(url, entry, HTTP_CACHE.read(key))
+    if HTTP_CACHE_MODE == "replay":
+        raise CacheMiss(url)
+
+    response = request_with_retry(
+        source, "GET", url, params=params,
+        headers=conditional_headers(entry, headers), **kwargs
+    )
+    if response.status_code == 304 and entry:
+        HTTP_CACHE.refresh(key, response.headers)
+        return _cached_response(url, entry, HTTP_CACHE.read(key))
+    if response.status_code == 200:
+        HTTP_CACHE.put(key, url, response)
+    return response
+
+
+def call_with_backoff(source, func, *args, **kwargs):
+    """Appelle une librairie tierce (pytrends, jobspy) sous le limiteur de la source"""
+    limiter = RATE_LIMITERS[source]
+
+    for attempt in range(MAX_RETRIES + 1):
+        limiter.acquire()
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            response = getattr(e, "response", None)
+            status = getattr(response, "status_code", None)
+            if status != 429 and "429" not in str(e):
+                raise
+            if attempt == MAX_RETRIES:
+                raise
+            wait = limiter.wait_from_headers(response.headers) if response is not None else None
+            delay = wait if wait is not None else limiter.backoff_delay(attempt)
+            logger.warning(f"{source}: rate limit atteint, pause de {delay:.1f}s")
+            limiter.block_for(delay)
+
+
+def run_units(source, units, func):
+    """Exécute func(*unit) pour chaque unité dans le pool de la source.
+
+    Les résultats sont renvoyés dans l'ordre des unités ; une unité en erreur
+    renvoie None sans interrompre les autres.
+    """
+    workers = max(1, SOURCES_CONFIG[source]["workers"])
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=source) as pool:
+        futures = [(unit, pool.submit(func, *unit)) for unit in units]
+        results = []
+        for unit, future in futures:
+            try:
+                results.append(future.result())
             except Exception as e:
-                logger.error(f"Erreur Pytrends pour '{keyword}': {e}")
-                if "429" in str(e):
-                    logger.error("Rate limit atteint. Pause de 120s.")
-                    time.sleep(120)
+                logger.error(f"Erreur {source} {unit}: {e}")
+                results.append(None)
+    return results
+
+
+_trends_local = threading.local()
+
+
+def _get_pytrends():
+    """Une session Pytrends par thread (TrendReq n'est pas thread-safe)"""
+    if not hasattr(_trends_local, "pytrends"):
+        _trends_local.pytrends = TrendReq(timeout=(10, 25))
+    return _trends_local.pytrends
+
+
+def load_trend_keywords():
+    """Mots-clés suivis : la dimension compétences si elle existe, sinon la liste par défaut"""
+    try:
+        skills = pd.read_csv(SKILLS_DIM_PATH)["tech_label"].dropna().astype(str)
+        keywords = list(dict.fromkeys(skill.strip() for skill in skills if skill.strip()))
+    except (OSError, KeyError, ValueError) as e:
+        logger.warning(f"Dimension compétences illisible ({e}), mots-clés par défaut")
+        keywords = []
+    return keywords or DEFAULT_TREND_KEYWORDS
+
+
+def trend_batches(keywords, anchor):
+    """Lots de mots-clés, chacun préfixé par l'ancre"""
+    others = [keyword for keyword in keywords if keyword != anchor]
+    size = TRENDS_BATCH_SIZE - 1
+    return [
+        [anchor] + others[i:i + size] for i in range(0, len(others), size)
+    ] or [[anchor]]
+
+
+def _fetch_trend_batch(checkpoint, batch):
+    """Collecte un lot de mots-clés ; renvoie {mot-clé: {date: valeur}} ou None"""
+    done = checkpoint.get(*batch)
+    if done is not None:
+        return done
+
+    try:
+        logger.info(f"Collecte des tendances pour : {batch}")
+        pytrends = _get_pytrends()
+
+        def fetch():
+            pytrends.build_payload(
+                batch, cat=0, timeframe=TRENDS_TIMEFRAME, geo="", gprop=""
+            )
+            return pytrends.interest_over_time()
+
+        interest_over_time_df = call_with_backoff("google_trends", fetch)
+
+        series = {}
+        if not interest_over_time_df.empty:
+            for keyword in batch:
+                if keyword in interest_over_time_df and not interest_over_time_df[keyword].empty:
+                    series[keyword] = {
+                        str(k.date()): float(v)
+                        for k, v in interest_over_time_df[keyword].items()
+                    }
+        if not series:
+            logger.warning(f"Aucune donnée de tendance pour {batch}.")
+
+        # Le résultat brut du lot est gardé dans le checkpoint pour la normalisation finale
+        checkpoint.mark(*batch, info=series)
+        return series
+
+    except Exception as e:
+        logger.error(f"Erreur Pytrends pour {batch}: {e}")
+        return None
+
+
+def normalize_trend_batches(results, anchor):
+    """Ramène chaque lot à l'échelle du premier via l'ancre, puis l'ensemble sur 0-100.
+
+    Google Trends normalise chaque payload sur son propre maximum : le rapport
+    des moyennes de l'ancre entre deux lots donne le facteur de conversion.
+    """
+    reference = None
+    scaled = {}
+    for series in results:
+        anchor_values = list(series.get(anchor, {}).values())
+        anchor_mean = sum(anchor_values) / len(anchor_values) if anchor_values else 0
+        if not anchor_mean:
+            logger.warning(f"Ancre '{anchor}' absente ou nulle, lot ignoré : {list(series)}")
+            continue
+        if reference is None:
+            reference = anchor_mean
+        factor = reference / anchor_mean
+        for keyword, values in series.items():
+            if keyword == anchor and keyword in scaled:
                 continue
+            scaled[keyword] = {date: value * factor for date, value in values.items()}
+
+    peak = max((v for values in scaled.values() for v in values.values()), default=0)
+    if not peak:
+        return scaled
+    return {
+        keyword: {date: round(value * 100 / peak, 2) for date, value in values.items()}
+        for keyword, values in scaled.items()
+    }
+
+
+def scrape_google_trends():
+    """Collecte les tendances Google par lots de 5 mots-clés partageant une ancre."""
+    logger.info("Démarrage Google Trends")
+    # La sortie est recalculée à partir de tous les lots du checkpoint : réécrite, même en reprise
+    checkpoint, _ = open_collection("google_trends")
+    writer = NdjsonWriter("google_trends", truncate=True)
+    failures = 0
+
+    try:
+        keywords = load_trend_keywords()
+        anchor = TRENDS_ANCHOR if TRENDS_ANCHOR in keywords else keywords[0]
+        batches = trend_batches(keywords, anchor)
+        logger.info(f"Google Trends: {len(keywords)} mots-clés en {len(batches)} requêtes (ancre '{anchor}')")
+
+        results = run_units(
+            "google_trends", [(checkpoint, batch) for batch in batches], _fetch_trend_batch
+        )
+        failures = sum(1 for series in results if series is None)
+
+        scraped_at = datetime.now().isoformat()
+        normalized = normalize_trend_batches([series for series in results if series], anchor)
+        writer.write([
+            {
+                "source": "google_trends",
+                "keyword": keyword,
+                "anchor": anchor,
+                "interest_over_time": interest,
+                "scraped_at": scraped_at,
+            }
+            for keyword, interest in normalized.items()
+        ])
 
     except Exception as e:
         logger.error(f"Erreur critique Google Trends: {e}")
+        failures += 1
+
+    close_collection("google_trends", checkpoint, [writer], failures)
+    logger.info(f"Google Trends: {writer.count} tendances collectées.")
+
+
+def _adzuna_record(job, country, query):
+    """Normalise une offre Adzuna"""
+    return {
+        "source": "adzuna",
+        "country": country,
+        "query": query,
+        "title": job.get("title"),
+        "company": job.get("company", {}).get("display_name"),
+        "location": job.get("location", {}).get("display_name"),
+        "salary_min": job.get("salary_min"),
+        "salary_max": job.get("salary_max"),
+        "description": job.get("description"),
+        "created": job.get("created"),
+        "scraped_at": datetime.now().isoformat(),
+    }
 
-    if trends_data:
-        with open(f"{RAW_DATA_DIR}/google_trends.json", "w", encoding="utf-8") as f:
-            json.dump(trends_data, f, indent=2, ensure_ascii=False)
 
-    logger.info(f"Google Trends: {len(trends_data)} tendances collectées.")
+def _fetch_adzuna_page(checkpoint, writer, app_id, api_key, country, query, page, exhausted=None):
+    """Collecte une page Adzuna pour un couple (pays, requête).
+
+    Renvoie (nombre d'offres de la page, total annoncé), ou None en cas
+    d'échec. Une page est ignorée si une page précédente du même couple est
+    déjà revenue incomplète.
+    """
+    if exhausted is not None and exhausted.get((country, query), math.inf) < page:
+        return 0, None
+
+    done = checkpoint.get(country, query, page)
+    if done:
+        result = done["records"], done["count"]
+    else:
+        try:
+            url = f"{ADZUNA_BASE_URL}/{country}/search/{page}"
+            params = {
+                "app_id": app_id,
+                "app_key": api_key,
+                "what": query,
+                "results_per_page": ADZUNA_RESULTS_PER_PAGE,
+                "content-type": "application/json",
+            }
+
+            response = http_get("adzuna", url, params=params, timeout=30)
+            response.raise_for_status()
+            data = response.json()
+            jobs = [_adzuna_record(job, country, query) for job in data.get("results", [])]
+            writer.write(jobs)
+            result = len(jobs), data.get("count")
+            checkpoint.mark(country, query, page, info={"records": result[0], "count": result[1]})
+
+        except Exception as e:
+            logger.error(f"Erreur Adzuna {country}/{query} page {page}: {e}")
+            return None
+
+    if exhausted is not None and result[0] < ADZUNA_RESULTS_PER_PAGE:
+        key = (country, query)
+        exhausted[key] = min(exhausted.get(key, math.inf), page)
+
+    return result
 
 
 def scrape_adzuna_api():
-    """Collecte via API Adzuna"""
+    """Collecte via API Adzuna, paginée jusqu'à ADZUNA_MAX_PAGES pages par requête"""
     logger.info("Démarrage API Adzuna")
 
     app_id = os.getenv("ADZUNA_APP_ID")
@@ -93,147 +834,501 @@ def scrape_adzuna_api():
 
     countries = ["fr", "de", "nl", "es", "it", "pl", "gb", "ch", "at", "be"]
     tech_queries = ["python developer", "javascript developer", "react developer"]
-    adzuna_data = []
+    pairs = [(country, query) for country in countries for query in tech_queries]
 
-    for country in countries:
-        for query in tech_queries:
-            try:
-                url = f"https://api.adzuna.com/v1/api/jobs/{country}/search/1"
-                params = {
-                    "app_id": app_id,
-                    "app_key": api_key,
-                    "what": query,
-                    "results_per_page": 50,
-                    "content-type": "application/json",
-                }
-
-                response = requests.get(url, params=params, timeout=30)
-                if response.status_code == 200:
-                    data = response.json()
-
-                    for job in data.get("results", []):
-                        job_data = {
-                            "source": "adzuna",
-                            "country": country,
-                            "query": query,
-                            "title": job.get("title"),
-                            "company": job.get("company", {}).get("display_name"),
-                            "location": job.get("location", {}).get("display_name"),
-                            "salary_min": job.get("salary_min"),
-                            "salary_max": job.get("salary_max"),
-                            "description": job.get("description"),
-                            "created": job.get("created"),
-                            "scraped_at": datetime.now().isoformat(),
-                        }
-                        adzuna_data.append(job_data)
-
-                time.sleep(1)
+    checkpoint, (writer,) = open_collection("adzuna", "adzuna_jobs")
+    failures = 0
 
-            except Exception as e:
-                logger.error(f"Erreur Adzuna {country}/{query}: {e}")
-                continue
+    # Première page de chaque couple : elle donne le nombre total d'offres
+    first_pages = run_units(
+        "adzuna",
+        [(checkpoint, writer, app_id, api_key, country, query, 1) for country, query in pairs],
+        _fetch_adzuna_page,
+    )
+
+    last_pages = {}
+    for (country, query), result in zip(pairs, first_pages):
+        if not result:
+            failures += 1
+            continue
+        records, count = result
+        if records == ADZUNA_RESULTS_PER_PAGE and count:
+            last_pages[(country, query)] = min(
+                ADZUNA_MAX_PAGES, math.ceil(count / ADZUNA_RESULTS_PER_PAGE)
+            )
 
-    with open(f"{RAW_DATA_DIR}/adzuna_jobs.json", "w", encoding="utf-8") as f:
-        json.dump(adzuna_data, f, indent=2, ensure_ascii=False)
+    # Pages suivantes en parallèle, ordonnées page par page : une page
+    # incomplète arrête son couple avant que les suivantes ne soient lancées
+    exhausted = {}
+    next_units = [
+        (checkpoint, writer, app_id, api_key, country, query, page, exhausted)
+        for page in range(2, max(last_pages.values(), default=1) + 1)
+        for (country, query), last_page in last_pages.items()
+        if page <= last_page
+    ]
+    results = run_units("adzuna", next_units, _fetch_adzuna_page)
+    failures += sum(1 for result in results if result is None)
 
-    logger.info(f"Adzuna terminé: {len(adzuna_data)} offres collectées")
+    close_collection("adzuna", checkpoint, [writer], failures)
+    logger.info(
+        f"Adzuna terminé: {writer.count} offres collectées "
+        f"({len(pairs) + len(next_units)} pages planifiées)"
+    )
+
+
+def _github_record(repo, lang):
+    """Normalise un repo GitHub"""
+    return {
+        "source": "github",
+        "language": lang,
+        "name": repo.get("name"),
+        "full_name": repo.get("full_name"),
+        "owner_location": repo.get("owner", {}).get("location"),
+        "stars": repo.get("stargazers_count"),
+        "forks": repo.get("forks_count"),
+        "created_at": repo.get("created_at"),
+        "updated_at": repo.get("updated_at"),
+        "description": repo.get("description"),
+        "scraped_at": datetime.now().isoformat(),
+    }
+
+
+def _github_date(value):
+    return value.strftime("%Y-%m-%d")
+
+
+def _github_day(value):
+    """Début du jour (UTC) d'un horodatage"""
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _fetch_github_page(checkpoint, writer, seen, headers, lang, shard, page):
+    """Collecte une page de recherche GitHub pour un shard [début, fin[ (pushed depuis).
+
+    Renvoie le nombre total de résultats du shard. Les repos de la page ne
+    sont écrits que si le shard tient sous la limite de recherche (sinon il
+    sera redécoupé) ; `seen` évite les doublons aux bornes des shards.
+    """
+    start, end, pushed_since = shard
+    done = checkpoint.get(lang, *shard, page)
+    if done:
+        return done["total"]
+
+    query = (
+        f"language:{lang} stars:>={GITHUB_MIN_STARS} "
+        f"created:{_github_date(start)}..{_github_date(end - GITHUB_MIN_SHARD)}"
+    )
+    if pushed_since:
+        query += f" pushed:>={_github_date(pushed_since)}"
+
+    params = {
+        "q": query,
+        "sort": "stars",
+        "order": "desc",
+        "per_page": GITHUB_PER_PAGE,
+        "page": page,
+    }
+    response = http_get(
+        "github", f"{GITHUB_API_URL}/search/repositories",
+        params=params, headers=headers, timeout=30
+    )
+    response.raise_for_status()
+    data = response.json()
+    total = data.get("total_count", 0)
+
+    if not _github_should_split(total, shard):
+        repos = []
+        with writer.lock:
+            for repo in data.get("items", []):
+                if repo.get("full_name") not in seen:
+                    seen.add(repo.get("full_name"))
+                    repos.append(_github_record(repo, lang))
+        writer.write(repos)
+
+    checkpoint.mark(lang, *shard, page, info={"total": total})
+    return total
+
+
+def _github_should_split(total, shard):
+    start, end, _ = shard
+    return total > GITHUB_SEARCH_CAP and end - start > GITHUB_MIN_SHARD
 
 
 def scrape_github_trends():
-    """Collecte GitHub trending repos"""
+    """Collecte GitHub incrémentale : repos créés ou poussés depuis la dernière exécution.
+
+    La période de création est découpée en shards de moins de 1000 résultats
+    (limite de la recherche GitHub), collectés en parallèle.
+    """
     logger.info("Démarrage GitHub API")
 
     github_token = os.getenv("GITHUB_TOKEN")
     headers = {"Authorization": f"token {github_token}"} if github_token else {}
 
     languages = ["Rust","Python", "JavaScript", "Go", "TypeScript", "Java"]
-    github_data = []
 
+    checkpoint, (writer,) = open_collection("github", "github_trends")
+    watermarks = load_state("github_watermarks", {})
+    last_run = load_state("github_last_run", {})
+    replay = HTTP_CACHE_MODE == "replay" and bool(last_run)
+    if replay:
+        # Hors ligne : mêmes shards que la dernière collecte en ligne, donc mêmes clés de cache
+        watermarks = last_run["watermarks"]
+    # En reprise, la date de début est conservée pour retrouver les mêmes shards
+    run_start = checkpoint.get("run_start") or (replay and last_run["run_start"])
+    if run_start:
+        run_start = _github_day(datetime.fromisoformat(run_start))
+    else:
+        run_start = _github_day(datetime.now(timezone.utc))
+        checkpoint.mark("run_start", info=run_start.isoformat())
+    if HTTP_CACHE_MODE != "replay":
+        save_state("github_last_run", {"run_start": run_start.isoformat(), "watermarks": watermarks})
+    created_since = _github_day(
+        datetime.fromisoformat(GITHUB_CREATED_SINCE).replace(tzinfo=timezone.utc)
+    )
+
+    pending = []
     for lang in languages:
+        if lang in watermarks:
+            watermark = _github_day(datetime.fromisoformat(watermarks[lang]))
+            # Nouveaux repos depuis le watermark + anciens repos poussés depuis
+            if watermark < run_start:
+                pending.append((lang, (watermark, run_start, None)))
+            pending.append((lang, (created_since, watermark, watermark)))
+        else:
+            pending.append((lang, (created_since, run_start, None)))
+
+    seen = set()
+    failed = set()
+    page_units = []
+
+    # Sondage des shards (page 1) ; un shard au-delà de la limite est coupé en deux
+    while pending:
+        results = run_units(
+            "github",
+            [(checkpoint, writer, seen, headers, lang, shard, 1) for lang, shard in pending],
+            _fetch_github_page,
+        )
+        next_pending = []
+        for (lang, shard), total in zip(pending, results):
+            if total is None:
+                failed.add(lang)
+                continue
+            start, end, pushed_since = shard
+            if _github_should_split(total, shard):
+                middle = start + GITHUB_MIN_SHARD * ((end - start) // GITHUB_MIN_SHARD // 2)
+                next_pending.append((lang, (start, middle, pushed_since)))
+                next_pending.append((lang, (middle, end, pushed_since)))
+                continue
+            if total > GITHUB_SEARCH_CAP:
+                logger.warning(
+                    f"GitHub {lang}: {total} repos créés le {_github_date(start)}, "
+                    f"seuls les {GITHUB_SEARCH_CAP} premiers sont collectés"
+                )
+            last_page = math.ceil(min(total, GITHUB_SEARCH_CAP) / GITHUB_PER_PAGE)
+            page_units.extend(
+                (checkpoint, writer, seen, headers, lang, shard, page)
+                for page in range(2, last_page + 1)
+            )
+        pending = next_pending
+
+    for unit, total in zip(page_units, run_units("github", page_units, _fetch_github_page)):
+        if total is None:
+            failed.add(unit[4])
+
+    close_collection("github", checkpoint, [writer], len(failed))
+
+    # Le watermark n'avance que pour les langages collectés sans erreur (jamais en replay)
+    if HTTP_CACHE_MODE != "replay":
+        for lang in languages:
+            if lang not in failed:
+                watermarks[lang] = run_start.isoformat()
+        save_state("github_watermarks", watermarks)
+
+    if failed:
+        logger.warning(f"GitHub: watermark conservé pour {sorted(failed)}")
+    logger.info(f"GitHub terminé: {writer.count} repos collectés")
+
+
+def _download_resumable(url, path, headers, entry):
+    """Télécharge url vers path en reprenant un éventuel .part (requêtes Range).
+
+    Renvoie la réponse, ou None si le serveur répond 304 (contenu inchangé).
+    """
+    part_path = f"{path}.part"
+    meta_path = f"{part_path}.meta"
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+
+    request_headers = dict(headers)
+    if offset:
+        # If-Range : le serveur renvoie tout le fichier s'il a changé entre-temps
         try:
-            url = "https://api.github.com/search/repositories"
-            params = {
-                "q": f"language:{lang} created:>2024-01-01",
-                "sort": "stars",
-                "order": "desc",
-                "per_page": 100,
-            }
+            with open(meta_path, encoding="utf-8") as f:
+                validator = json.load(f).get("validator")
+        except (OSError, ValueError):
+            validator = None
+        request_headers["Range"] = f"bytes={offset}-"
+        if validator:
+            request_headers["If-Range"] = validator
+    else:
+        request_headers = conditional_headers(entry, request_headers)
 
-            response = requests.get(url, params=params, headers=headers, timeout=30)
-            if response.status_code == 200:
-                data = response.json()
-
-                for repo in data.get("items", []):
-                    repo_data = {
-                        "source": "github",
-                        "language": lang,
-                        "name": repo.get("name"),
-                        "full_name": repo.get("full_name"),
-                        "owner_location": repo.get("owner", {}).get("location"),
-                        "stars": repo.get("stargazers_count"),
-                        "forks": repo.get("forks_count"),
-                        "created_at": repo.get("created_at"),
-                        "updated_at": repo.get("updated_at"),
-                        "description": repo.get("description"),
-                        "scraped_at": datetime.now().isoformat(),
-                    }
-                    github_data.append(repo_data)
+    response = request_with_retry(
+        "stackoverflow", "GET", url, headers=request_headers, timeout=180, stream=True
+    )
+    if response.status_code == 304:
+        return None
+    if response.status_code == 416 and offset:
+        os.replace(part_path, path)
+        return response
+    response.raise_for_status()
 
-            time.sleep(1)
+    if response.status_code == 206:
+        logger.info(f"Stack Overflow: reprise du téléchargement à {offset} bytes")
+        mode = "ab"
+    else:
+        mode = "wb"
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"validator": response.headers.get("ETag") or response.headers.get("Last-Modified")},
+                f,
+            )
 
-        except Exception as e:
-            logger.error(f"Erreur GitHub {lang}: {e}")
-            continue
+    with open(part_path, mode) as f:
+        for chunk in response.iter_content(chunk_size=1024 * 1024):
+            if chunk:
+                f.write(chunk)
+
+    os.replace(part_path, path)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    return response
 
-    with open(f"{RAW_DATA_DIR}/github_trends.json", "w", encoding="utf-8") as f:
-        json.dump(github_data, f, indent=2, ensure_ascii=False)
 
-    logger.info(f"GitHub terminé: {len(github_data)} repos collectés")
+def _survey_to_parquet(zip_path, parquet_path, year):
+    """Lit le CSV du survey directement dans le ZIP et n'en garde que les colonnes utiles"""
+    wanted = set(SO_SURVEY_SCHEMA.names) | set(SO_SURVEY_ALIASES)
+    rows = 0
+
+    with zipfile.ZipFile(zip_path, "r") as zip_ref:
+        csv_files = [
+            f
+            for f in zip_ref.namelist()
+            if f.endswith(".csv") and "survey_results_public" in f.lower()
+        ]
+        if not csv_files:
+            logger.error("Aucun fichier CSV trouvé dans le ZIP")
+            return 0
+
+        tmp_path = f"{parquet_path}.tmp"
+        with zip_ref.open(csv_files[0]) as csv_stream, pq.ParquetWriter(
+            tmp_path, SO_SURVEY_SCHEMA, compression="zstd"
+        ) as writer:
+            chunks = pd.read_csv(
+                csv_stream,
+                usecols=lambda col: col in wanted,
+                dtype=str,
+                chunksize=SO_SURVEY_CHUNK_ROWS,
+            )
+            for chunk in chunks:
+                chunk = chunk.rename(columns=SO_SURVEY_ALIASES)
+                chunk["SurveyYear"] = int(year)
+                chunk = chunk.reindex(columns=SO_SURVEY_SCHEMA.names)
+                for col in ("ResponseId", "CompTotal"):
+                    chunk[col] = pd.to_numeric(chunk[col], errors="coerce")
+                writer.write_table(
+                    pa.Table.from_pandas(chunk, schema=SO_SURVEY_SCHEMA, preserve_index=False)
+                )
+                rows += len(chunk)
+
+    os.replace(tmp_path, parquet_path)
+    return rows
+
+
+def _download_survey_year(year):
+    """Télécharge et projette le survey d'une année"""
+    zip_file_path = f"{RAW_DATA_DIR}/stackoverflow_survey_{year}.zip"
+    survey_file_path = f"{RAW_DATA_DIR}/stackoverflow_survey_{year}.parquet"
+    zip_url = SO_SURVEY_URL.format(year=year)
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36"
+    }
+
+    # L'archive n'est pas gardée : le cache ne conserve que ses validateurs
+    cache_key = HttpCache.key(zip_url)
+    entry = HTTP_CACHE.get(cache_key) if HTTP_CACHE_MODE != "off" else None
+    if entry and (HTTP_CACHE_MODE == "replay" or HTTP_CACHE.is_fresh(entry)):
+        logger.info(f"Stack Overflow {year}: survey déjà à jour (cache)")
+        return
+    if HTTP_CACHE_MODE == "replay":
+        logger.warning(f"Stack Overflow {year}: survey absent du cache, ignoré en mode replay")
+        return
+
+    response = _download_resumable(zip_url, zip_file_path, headers, entry)
+    if response is None:
+        HTTP_CACHE.refresh(cache_key, {})
+        logger.info(f"Stack Overflow {year}: survey inchangé (304)")
+        return
+
+    rows = _survey_to_parquet(zip_file_path, survey_file_path, year)
+    os.remove(zip_file_path)
+    if not rows:
+        return
+    if HTTP_CACHE_MODE != "off":
+        HTTP_CACHE.put_meta(cache_key, zip_url, response.headers, survey_file_path)
+
+    logger.info(
+        f"Stack Overflow {year}: {rows} réponses, "
+        f"{os.path.getsize(survey_file_path)} bytes (parquet)"
+    )
 
 
 def download_stackoverflow_survey():
-    """Télécharge Stack Overflow Survey 2024 depuis le site officiel (ZIP)."""
+    """Télécharge les Stack Overflow Surveys (SO_SURVEY_YEARS) depuis le site officiel (ZIP)."""
     logger.info("Démarrage Stack Overflow Survey")
-    zip_file_path = f"{RAW_DATA_DIR}/stackoverflow_survey_2024.zip"
-    survey_file_path = f"{RAW_DATA_DIR}/stackoverflow_survey_2024.csv"
+    for year in SO_SURVEY_YEARS:
+        try:
+            _download_survey_year(year)
+        except Exception as e:
+            logger.error(f"Erreur Stack Overflow {year}: {e}")
+
+
+class _LimitedSession:
+    """Session d'un scraper JobSpy dont les requêtes passent par le limiteur de la source"""
+
+    def __init__(self, source, session):
+        self.source = source
+        self.session = session
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("timeout", 30)
+        return request_with_retry(self.source, "GET", url, session=self.session, **kwargs)
+
+
+_linkedin_local = threading.local()
+
+
+def _get_linkedin_scraper():
+    """Un scraper LinkedIn JobSpy par thread, pour les pages de détail"""
+    if not hasattr(_linkedin_local, "scraper"):
+        scraper = LinkedIn()
+        scraper.scraper_input = ScraperInput(description_format=DescriptionFormat.HTML)
+        scraper.session = _LimitedSession("linkedin", scraper.session)
+        _linkedin_local.scraper = scraper
+    return _linkedin_local.scraper
+
+
+def _fetch_linkedin_details(job_id):
+    """Champs de la page de détail d'une offre LinkedIn, aplatis comme dans scrape_jobs.
+
+    L'analyse est celle de JobSpy (description, rémunération, type de contrat,
+    niveau, fonction, secteur, e-mails, logo) ; renvoie None si la page n'a pas
+    pu être lue.
+    """
+    details = _get_linkedin_scraper()._fetch_details(job_id.removeprefix("li-"))
+    if not details:
+        return None
+
+    row = {
+        name: details.get(name)
+        for name in ("description", "job_level", "job_function", "company_industry", "company_logo")
+    }
+    row["job_type"] = (
+        ", ".join(job_type.value[0] for job_type in details["job_type"])
+        if details.get("job_type") else None
+    )
+    row["emails"] = ", ".join(details["emails"]) if details.get("emails") else None
+    row |= dict.fromkeys(("interval", "min_amount", "max_amount", "currency", "salary_source"))
+    if compensation := details.get("compensation"):
+        row["interval"] = compensation.interval.value if compensation.interval else None
+        row["min_amount"] = compensation.min_amount
+        row["max_amount"] = compensation.max_amount
+        row["currency"] = compensation.currency
+        row["salary_source"] = SalarySource.DIRECT_DATA.value
+    return row
+
+
+def _fetch_jobspy(checkpoint, writers, seen, seen_ids, country_name, config, keyword):
+    """Collecte Indeed + LinkedIn pour un couple (pays, mot-clé) ; renvoie True si terminé.
+
+    La recherche se fait sans les pages de détail LinkedIn : elles ne sont
+    récupérées qu'ensuite, pour les offres jamais vues. Les offres déjà
+    collectées lors d'un run précédent sont réécrites telles que renvoyées par
+    la recherche, sans page de détail.
+    """
+    if checkpoint.get(country_name, keyword):
+        return True
 
     try:
-        zip_url = "https://survey.stackoverflow.co/datasets/stack-overflow-developer-survey-2024.zip"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36"
-        }
-
-        response = requests.get(zip_url, headers=headers, timeout=180, stream=True)
-        response.raise_for_status()
-
-        with open(zip_file_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-
-        with zipfile.ZipFile(zip_file_path, "r") as zip_ref:
-            csv_files = [
-                f
-                for f in zip_ref.namelist()
-                if f.endswith(".csv") and "survey_results_public" in f.lower()
-            ]
-            if csv_files:
-                csv_filename = csv_files[0]
-                zip_ref.extract(csv_filename, RAW_DATA_DIR)
-                extracted_path = os.path.join(RAW_DATA_DIR, csv_filename)
-                os.rename(extracted_path, survey_file_path)
-            else:
-                logger.error("Aucun fichier CSV trouvé dans le ZIP")
-                return
-
-        os.remove(zip_file_path)
-
-        logger.info(
-            f"Stack Overflow: {os.path.getsize(survey_file_path)} bytes téléchargés"
+        jobs = call_with_backoff(
+            "jobspy",
+            scrape_jobs,
+            site_name=["indeed", "linkedin"],
+            search_term=keyword,
+            location=config['location'],
+            country_indeed=config['country'],
+            results_wanted=25,
+            hours_old=168,
+            job_type='fulltime',
+            description_format='html',
+            fetch_description=False,
+            verbose=1
         )
 
+        if not jobs.empty:
+            jobs['search_keyword'] = keyword
+            jobs['target_country'] = country_name
+            jobs['scraped_at'] = pd.Timestamp.now()
+
+            # Doublons entre couples (pays, mot-clé) de cette exécution : non réécrits
+            keys = list(zip(jobs['title'], jobs['company'], jobs['location'], jobs['site']))
+            with writers['indeed'].lock:
+                new_keys = [key not in seen for key in keys]
+                seen.update(keys)
+            jobs = jobs[new_keys].drop_duplicates(subset=['title', 'company', 'location', 'site'])
+
+            records = jobs.to_dict('records')
+            ids = [str(record['id']) for record in records]
+            new_ids = seen_ids.claim(ids)
+
+            # Pages de détail uniquement pour les offres LinkedIn jamais vues
+            to_fetch = [
+                i for i, (record, new) in enumerate(zip(records, new_ids))
+                if new and record['site'] == 'linkedin'
+            ]
+            details = run_units(
+                "linkedin", [(ids[i],) for i in to_fetch], _fetch_linkedin_details
+            ) if to_fetch else []
+            failed = set()
+            for i, row in zip(to_fetch, details):
+                if row is None:
+                    failed.add(i)
+                else:
+                    records[i].update(row)
+
+            for site, writer in writers.items():
+                writer.write([record for record in records if record['site'] == site])
+
+            # Seuls les IDs complets sont mémorisés ; les échecs seront retentés
+            seen_ids.persist([
+                job_id for i, (job_id, new) in enumerate(zip(ids, new_ids))
+                if new and i not in failed
+            ])
+            seen_ids.release([ids[i] for i in failed])
+
+            indeed_count = sum(record['site'] == 'indeed' for record in records)
+            linkedin_count = len(records) - indeed_count
+            logger.info(
+                f"{country_name}/{keyword}: Indeed={indeed_count}, LinkedIn={linkedin_count} "
+                f"(détails {len(to_fetch) - len(failed)}/{len(to_fetch)})"
+            )
+
+        checkpoint.mark(country_name, keyword)
+        return True
+
     except Exception as e:
-        logger.error(f"Erreur Stack Overflow: {e}")
+        logger.error(f"Erreur {country_name}/{keyword}: {e}")
+        return False
 
 
 def scrape_indeed_linkedin_jobs():
@@ -261,61 +1356,33 @@ def scrape_indeed_linkedin_jobs():
         '"frontend developer" react'
     ]
     
-    all_jobs_data = []
-    
-    for country_name, config in countries_config.items():
-        logger.info(f"Collecte Indeed + LinkedIn {country_name}")
-        
-        for keyword in tech_keywords:
-            try:
-                jobs = scrape_jobs(
-                    site_name=["indeed", "linkedin"],
-                    search_term=keyword,
-                    location=config['location'],
-                    country_indeed=config['country'],
-                    results_wanted=25,
-                    hours_old=168,
-                    job_type='fulltime',
-                    description_format='html',
-                    linkedin_fetch_description=True,
-                    verbose=1
-                )
-                
-                if not jobs.empty:
-                    jobs['search_keyword'] = keyword
-                    jobs['target_country'] = country_name
-                    jobs['scraped_at'] = pd.Timestamp.now()
-                    all_jobs_data.append(jobs)
-                    
-                    indeed_count = len(jobs[jobs['site'] == 'indeed'])
-                    linkedin_count = len(jobs[jobs['site'] == 'linkedin'])
-                    logger.info(f"{country_name}/{keyword}: Indeed={indeed_count}, LinkedIn={linkedin_count}")
-                
-                time.sleep(5)
-                    
-            except Exception as e:
-                logger.error(f"Erreur {country_name}/{keyword}: {e}")
-                continue
-    
-    if all_jobs_data:
-        all_jobs = pd.concat(all_jobs_data, ignore_index=True)
-        all_jobs = all_jobs.drop_duplicates(subset=['title', 'company', 'location', 'site'])
-        indeed_jobs = all_jobs[all_jobs['site'] == 'indeed']
-        linkedin_jobs = all_jobs[all_jobs['site'] == 'linkedin']
-        
-        if not indeed_jobs.empty:
-            indeed_json = indeed_jobs.to_dict('records')
-            with open(f"{RAW_DATA_DIR}/indeed_jobs.json", "w", encoding="utf-8") as f:
-                json.dump(indeed_json, f, indent=2, ensure_ascii=False, default=str)
-            logger.info(f"Indeed terminé: {len(indeed_jobs)} offres")
-        
-        if not linkedin_jobs.empty:
-            linkedin_json = linkedin_jobs.to_dict('records')
-            with open(f"{RAW_DATA_DIR}/linkedin_jobs.json", "w", encoding="utf-8") as f:
-                json.dump(linkedin_json, f, indent=2, ensure_ascii=False, default=str)
-            logger.info(f"LinkedIn terminé: {len(linkedin_jobs)} offres")
-        
-        logger.info(f"Total collecté: {len(all_jobs)} offres (Indeed + LinkedIn)")
+    checkpoint, (indeed_writer, linkedin_writer) = open_collection(
+        "jobspy", "indeed_jobs", "linkedin_jobs"
+    )
+    writers = {'indeed': indeed_writer, 'linkedin': linkedin_writer}
+    seen = set()
+    seen_ids = SeenIds("jobspy_seen_ids")
+    known_ids = len(seen_ids.ids)
+
+    units = [
+        (checkpoint, writers, seen, seen_ids, country_name, config, keyword)
+        for country_name, config in countries_config.items()
+        for keyword in tech_keywords
+    ]
+    results = run_units("jobspy", units, _fetch_jobspy)
+    close_collection(
+        "jobspy", checkpoint, writers.values(), sum(1 for done in results if not done)
+    )
+
+    logger.info(
+        f"JobSpy: {len(seen_ids.ids) - known_ids} nouvelles offres, "
+        f"{known_ids} déjà connues au démarrage (page de détail non récupérée)"
+    )
+    logger.info(f"Indeed terminé: {indeed_writer.count} offres")
+    logger.info(f"LinkedIn terminé: {linkedin_writer.count} offres")
+    total = indeed_writer.count + linkedin_writer.count
+    if total:
+        logger.info(f"Total collecté: {total} offres (Indeed + LinkedIn)")
     else:
         logger.warning("Aucune donnée Indeed/LinkedIn collectée")
 
@@ -324,18 +1391,36 @@ def main():
     """Fonction principale"""
     start_time = datetime.now()
 
-    scrape_adzuna_api()
-    scrape_github_trends()
-    scrape_google_trends()
-    download_stackoverflow_survey()
-    scrape_indeed_linkedin_jobs()
+    collectors = [
+        scrape_adzuna_api,
+        scrape_github_trends,
+        scrape_google_trends,
+        download_stackoverflow_survey,
+        scrape_indeed_linkedin_jobs,
+    ]
+
+    if SCRAPE_MODE == "sequential":
+        for collector in collectors:
+            collector()
+    else:
+        # Chaque source a son propre pool : la durée totale est celle de la plus lente
+        with ThreadPoolExecutor(max_workers=len(collectors), thread_name_prefix="source") as pool:
+            futures = [(collector, pool.submit(collector)) for collector in collectors]
+            for collector, future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Erreur critique {collector.__name__}: {e}")
 
     end_time = datetime.now()
     duration = end_time - start_time
 
     logger.info(f"Collecte terminée en {duration.total_seconds():.1f}s")
 
-    raw_files = [f for f in os.listdir(RAW_DATA_DIR) if f.endswith((".json", ".csv"))]
+    raw_files = [
+        f for f in os.listdir(RAW_DATA_DIR)
+        if f.endswith((".json", ".csv", ".ndjson", ".ndjson.gz", ".parquet"))
+    ]
     for file in raw_files:
         file_path = os.path.join(RAW_DATA_DIR, file)
         size = os.path.getsize(file_path)
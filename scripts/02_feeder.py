@@ -1,81 +1,480 @@
 import os
 import json
+import gzip
+import argparse
 import pandas as pd
+import pyarrow.parquet as pq
 import hashlib
-from pymongo import MongoClient
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pymongo import DeleteOne, MongoClient, ReplaceOne
+from pymongo.errors import BulkWriteError
 from dotenv import load_dotenv
 
 load_dotenv()
 
 uri = os.getenv("MONGO_URI")
-client = MongoClient(uri, serverSelectionTimeoutMS=5000)
-db = client['jobtech']
 
-# Connexion test
-try:
-    client.server_info()
-    print("[LOG] Connexion MongoDB réussie.")
-except Exception as e:
-    print("[ERREUR] Connexion MongoDB échouée :", e)
-    exit(1)
+# Connexions MongoDB partagées par les lots d'un même processus
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 10))
+
+# Processus d'ingestion parallèles (un fichier par processus)
+FEEDER_WORKERS = int(os.getenv("FEEDER_WORKERS", min(4, os.cpu_count() or 1)))
+
+# Taille des lots envoyés à MongoDB (un aller-retour par lot)
+BATCH_SIZE = int(os.getenv("FEEDER_BATCH_SIZE", 1000))
+
+# Clés naturelles par collection (ou préfixe de collection) : l'_id ne dépend
+# que de ces champs, un même document collecté deux fois garde le même _id
+NATURAL_KEYS = {
+    "indeed_jobs": ["id"],
+    "linkedin_jobs": ["id"],
+    "github_trends": ["full_name"],
+    "adzuna_jobs": ["title", "company", "created"],
+    "stackoverflow_survey": ["ResponseId"],
+}
+
+# Champs ignorés par l'empreinte de contenu : _content_hash sert à ne réécrire
+# que les documents modifiés, _ingested_at (date de la dernière écriture) au
+# nettoyage incrémental
+VOLATILE_FIELDS = {"_id", "scraped_at", "_content_hash", "_ingested_at"}
+
+# Champs lus par 03_clean_mongodb.py (READ_SPECS) : l'empreinte de contenu ne
+# porte que sur eux, un document dont seul un autre champ change n'est pas réécrit
+JOBSPY_CONTENT_FIELDS = [
+    "id", "site", "title", "company", "company_industry", "location", "date_posted",
+    "job_type", "is_remote", "search_keyword", "target_country", "description",
+    "min_amount", "max_amount", "currency", "interval",
+]
+CONTENT_FIELDS = {
+    "adzuna_jobs": [
+        "country", "query", "title", "company", "location", "description",
+        "salary_min", "salary_max", "created",
+    ],
+    "github_trends": [
+        "language", "name", "full_name", "owner_location", "stars", "forks",
+        "created_at", "updated_at",
+    ],
+    "google_trends": ["keyword", "interest_over_time"],
+    "stackoverflow_survey": [
+        "SurveyYear", "Country", "LanguageHaveWorkedWith", "CompTotal", "Currency",
+        "DevType", "YearsCodePro", "Employment", "EdLevel",
+    ],
+    "indeed_jobs": JOBSPY_CONTENT_FIELDS,
+    "linkedin_jobs": JOBSPY_CONTENT_FIELDS,
+}
+
+# Manifeste d'ingestion : taille, mtime et empreinte sha256 de chaque fichier ingéré
+MANIFEST_COLLECTION = "_ingest_manifest"
 
 # Répertoire des fichiers
-RAW_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'jobtech', 'raw'))
-print(f"[LOG] Recherche dans : {RAW_DIR}")
+RAW_DIR = os.getenv("RAW_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'raw'))
+
+_client = None
+
+def get_db():
+    """Base jobtech, via un client créé à la demande (un par processus)"""
+    global _client
+    if _client is None:
+        _client = MongoClient(uri, maxPoolSize=MONGO_MAX_POOL_SIZE, serverSelectionTimeoutMS=5000)
+    return _client['jobtech']
+
+def check_connection():
+    try:
+        get_db().client.server_info()
+        print("[LOG] Connexion MongoDB réussie.")
+        return True
+    except Exception as e:
+        print("[ERREUR] Connexion MongoDB échouée :", e)
+        return False
+
+def init_worker():
+    # Un client hérité du processus parent n'est pas utilisable après un fork
+    global _client
+    _client = None
 
 def get_files(raw_dir):
-    for root, _, files in os.walk(raw_dir):
+    for root, dirs, files in os.walk(raw_dir):
+        # Les dossiers cachés (cache HTTP, états du scraping) ne sont pas des données
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
         for file in files:
-            if file.endswith('.csv') or file.endswith('.json'):
+            if file.endswith(('.csv', '.json', '.ndjson', '.ndjson.gz', '.parquet')):
                 yield os.path.join(root, file)
 
 def hash_record(record):
-    """Crée un ID unique à partir du contenu du document"""
-    return hashlib.md5(json.dumps(record, sort_keys=True).encode('utf-8')).hexdigest()
+    """Crée un ID unique à partir du contenu du document (hors champs volatils)"""
+    content = {k: v for k, v in record.items() if k not in VOLATILE_FIELDS}
+    return hashlib.md5(json.dumps(content, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def collection_setting(settings, collection_name):
+    """Réglage d'une collection ou de sa famille (stackoverflow_survey_<année>)"""
+    for name, value in settings.items():
+        if collection_name == name or collection_name.startswith(f"{name}_"):
+            return value
+    return None
+
+def get_natural_key(collection_name):
+    return collection_setting(NATURAL_KEYS, collection_name)
+
+def row_hashes(frame):
+    """Empreinte 64 bits (hexadécimale) de chaque ligne, calculée en bloc.
+
+    Les colonnes sont de type object : chaque valeur est hachée telle quelle par
+    pd.util.hash_pandas_object (SipHash à clé fixe), sans inférence de type sur
+    le lot, et l'empreinte d'une ligne ne dépend pas des autres.
+    """
+    hashes = pd.util.hash_pandas_object(frame, index=False, categorize=False)
+    return [f"{value:016x}" for value in hashes.tolist()]
+
+def field_frame(docs, fields):
+    """Champs donnés d'un lot de documents, un document par ligne (absents : None)"""
+    return pd.DataFrame([[doc.get(field) for field in fields] for doc in docs], columns=fields, dtype=object)
+
+def natural_ids(docs, key):
+    """_id de chaque document d'après sa clé naturelle, None si la clé est vide.
+
+    Les valeurs de clé sont normalisées en texte (None et NaN donnent une chaîne
+    vide) puis hachées colonne par colonne pour tout le lot.
+    """
+    frame = field_frame(docs, key)
+    parts = frame.where(frame.notna(), "").astype(str).astype(object)
+    empty = (parts == "").all(axis=1).tolist()
+    return [None if blank else _id for _id, blank in zip(row_hashes(parts), empty)]
+
+def natural_id(doc, key):
+    """_id d'un document d'après sa clé naturelle, None si la clé est vide"""
+    return natural_ids([doc], key)[0]
+
+def content_hashes(collection_name, docs):
+    """Empreinte de contenu de chaque document, sur les seuls champs lus par le
+    nettoyage ; JSON canonique complet pour une collection non déclarée"""
+    fields = collection_setting(CONTENT_FIELDS, collection_name)
+    if not fields:
+        return [hash_record(doc) for doc in docs]
+    return row_hashes(field_frame(docs, fields))
+
+def assign_ids(collection_name, batch):
+    """Renseigne l'_id de chaque document d'un lot : clé naturelle de la
+    collection, empreinte de contenu à défaut (pas de clé ou clé vide)"""
+    key = get_natural_key(collection_name)
+    ids = natural_ids(batch, key) if key else [None] * len(batch)
+    for doc, _id in zip(batch, ids):
+        doc['_id'] = _id or hash_record(doc)
+
+# Caractères qui peuvent prolonger un nombre JSON
+NUMBER_CHARS = "0123456789+-.eE"
+
+def iter_json_array(f, chunk_size=1 << 20):
+    """Parse incrémental d'un tableau JSON : un élément à la fois, sans charger tout le fichier.
+
+    Un document JSON unique (objet) est renvoyé tel quel.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof, started = "", 0, False, False
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(buffer):
+            if eof:
+                return
+            buffer, pos = f.read(chunk_size), 0
+            eof = not buffer
+            continue
+
+        if not started:
+            started = True
+            if buffer[pos] == '[':
+                pos += 1
+            else:
+                yield json.loads(buffer[pos:] + f.read())
+                return
+            continue
+        if buffer[pos] == ']':
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+            # Un élément qui touche la fin du tampon peut être tronqué, un nombre
+            # aussi quand seuls des caractères de nombre le suivent (« 1. » + « 5 »,
+            # « 3e » + « 10 ») : on relit la suite avant de le valider
+            truncated = not eof and not buffer[end:].strip(NUMBER_CHARS)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            truncated = True
+        if truncated:
+            more = f.read(chunk_size)
+            eof = not more
+            buffer, pos = buffer[pos:] + more, 0
+            continue
+        yield item
+        pos = end
+        if pos > chunk_size:
+            buffer, pos = buffer[pos:], 0
+
+def iter_records(filepath, batch_size):
+    """Enregistrements d'un fichier brut, lus par morceaux selon le format"""
+    if filepath.endswith('.csv'):
+        for chunk in pd.read_csv(filepath, chunksize=batch_size):
+            yield from chunk.dropna(how='all').fillna("").to_dict(orient='records')
+    elif filepath.endswith('.parquet'):
+        for batch in pq.ParquetFile(filepath).iter_batches(batch_size=batch_size):
+            yield from batch.to_pylist()
+    elif filepath.endswith('.json'):
+        with open(filepath, encoding='utf-8') as f:
+            yield from iter_json_array(f)
+    elif filepath.endswith(('.ndjson', '.ndjson.gz')):
+        opener = gzip.open if filepath.endswith('.gz') else open
+        with opener(filepath, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
 
-def load_data(filepath):
+def load_batches(filepath, batch_size=BATCH_SIZE):
+    """Lots de taille fixe : la mémoire reste constante quelle que soit la taille du fichier"""
     print(f"[LOG] Chargement : {filepath}")
-    try:
-        if filepath.endswith('.csv'):
-            df = pd.read_csv(filepath).dropna(how='all')
-            data = df.fillna("").to_dict(orient='records')
-        elif filepath.endswith('.json'):
-            with open(filepath, encoding='utf-8') as f:
-                data = json.load(f)
-                if isinstance(data, dict):
-                    data = [data]
-        else:
-            data = []
-        print(f"[LOG] {len(data)} lignes chargées.")
-        return data
-    except Exception as e:
-        print(f"[ERREUR] Chargement échoué : {e}")
-        return []
+    batch = []
+    for record in iter_records(filepath, batch_size):
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def file_digest(filepath, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def check_manifest(filepath, key, force=False):
+    """Compare le fichier à sa dernière ingestion.
+
+    Renvoie (inchangé, entrée du manifeste). La taille et le mtime suffisent
+    quand ils n'ont pas bougé ; sinon l'empreinte sha256 tranche.
+    """
+    stat = os.stat(filepath)
+    entry = {"_id": key, "size": stat.st_size, "mtime": stat.st_mtime}
+    manifest = get_db()[MANIFEST_COLLECTION]
+    previous = None if force else manifest.find_one({"_id": key})
+
+    if previous and previous.get("size") == entry["size"] and previous.get("mtime") == entry["mtime"]:
+        entry["sha256"] = previous.get("sha256")
+        return True, entry
+
+    entry["sha256"] = file_digest(filepath)
+    if previous and previous.get("sha256") == entry["sha256"]:
+        # Fichier réécrit à l'identique : seul le mtime change
+        manifest.replace_one({"_id": key}, entry, upsert=True)
+        return True, entry
+    return False, entry
 
 def get_collection_name(filepath):
-    return os.path.splitext(os.path.basename(filepath))[0]
+    name = os.path.basename(filepath)
+    for ext in ('.ndjson.gz', '.ndjson'):
+        if name.endswith(ext):
+            return name[:-len(ext)]
+    return os.path.splitext(name)[0]
+
+def insert_data(collection_name, data, batch_size=BATCH_SIZE):
+    """Upsert idempotent par lots : un document déjà présent n'est ni réinséré ni compté en erreur.
 
-def insert_data(collection_name, data):
+    Seuls les documents nouveaux ou dont le contenu a changé sont écrits, et
+    datés dans _ingested_at ; les autres sont comptés inchangés sans
+    aller-retour d'écriture. Renvoie les compteurs inserted / matched /
+    updated / unchanged.
+    """
+    counts = {"inserted": 0, "matched": 0, "updated": 0, "unchanged": 0, "errors": 0}
     if not data:
-        return
+        return counts
+
+    collection = get_db()[collection_name]
+    for start in range(0, len(data), batch_size):
+        batch = data[start:start + batch_size]
+        assign_ids(collection_name, batch)
+        for doc, content_hash in zip(batch, content_hashes(collection_name, batch)):
+            doc['_content_hash'] = content_hash
+        try:
+            known = {
+                doc['_id']: doc.get('_content_hash')
+                for doc in collection.find({'_id': {'$in': [doc['_id'] for doc in batch]}}, {'_content_hash': 1})
+            }
+        except Exception as e:
+            counts["errors"] += len(batch)
+            print(f"[ERREUR] Lecture des empreintes de '{collection_name}' : {e}")
+            continue
+
+        changed = [doc for doc in batch if known.get(doc['_id']) != doc['_content_hash']]
+        counts["matched"] += len(batch) - len(changed)
+        if not changed:
+            continue
+        ingested_at = datetime.now(timezone.utc)
+        operations = []
+        for doc in changed:
+            doc['_ingested_at'] = ingested_at
+            operations.append(ReplaceOne({'_id': doc['_id']}, doc, upsert=True))
+        try:
+            result = collection.bulk_write(operations, ordered=False)
+            counts["inserted"] += result.upserted_count
+            counts["matched"] += result.matched_count
+            counts["updated"] += result.modified_count
+        except BulkWriteError as e:
+            details = e.details
+            counts["inserted"] += details.get("nUpserted", 0)
+            counts["matched"] += details.get("nMatched", 0)
+            counts["updated"] += details.get("nModified", 0)
+            counts["errors"] += len(details.get("writeErrors", []))
+            print(f"[ERREUR] Upsert dans '{collection_name}' : {len(details.get('writeErrors', []))} documents rejetés")
+        except Exception as e:
+            counts["errors"] += len(operations)
+            print(f"[ERREUR] Upsert dans '{collection_name}' : {e}")
+
+    counts["unchanged"] = counts["matched"] - counts["updated"]
+    return counts
+
+def ingest_file(filepath, raw_dir, force=False):
+    """Lit, empreinte et insère un fichier ; exécuté dans un processus du pool.
+
+    Renvoie (collection, compteurs, octets, ignoré).
+    """
+    collection_name = get_collection_name(filepath)
+    counts = {"inserted": 0, "matched": 0, "updated": 0, "unchanged": 0, "errors": 0}
+    key = os.path.relpath(filepath, raw_dir)
+    unchanged, entry = check_manifest(filepath, key, force)
+    if unchanged:
+        print(f"[LOG] Inchangé depuis la dernière ingestion, ignoré : {key}")
+        return collection_name, counts, entry["size"], True
+
+    lines = 0
     try:
-        for doc in data:
-            doc['_id'] = hash_record(doc)
-        result = db[collection_name].insert_many(data, ordered=False)
-        print(f"[LOG] {len(result.inserted_ids)} documents insérés dans '{collection_name}'.")
+        for batch in load_batches(filepath):
+            lines += len(batch)
+            for name, value in insert_data(collection_name, batch).items():
+                counts[name] += value
     except Exception as e:
-        print(f"[ERREUR] Insertion dans '{collection_name}' : {e}")
+        counts["errors"] += 1
+        print(f"[ERREUR] Chargement échoué : {e}")
+    print(f"[LOG] {lines} lignes traitées pour '{collection_name}'.")
+
+    # Un fichier partiellement ingéré sera retenté à la prochaine exécution
+    if not counts["errors"]:
+        get_db()[MANIFEST_COLLECTION].replace_one({"_id": key}, entry, upsert=True)
+    return collection_name, counts, entry["size"], False
+
+def migrate_ids(batch_size=BATCH_SIZE):
+    """Migration ponctuelle : réécrit sous leur _id de clé naturelle les documents
+    ingérés avec un autre _id (empreinte de contenu des premières versions du
+    feeder, ou clé naturelle hachée en MD5 avant le hachage par lots).
+
+    Les versions multiples d'un même document fusionnent en une seule, la plus
+    récemment ingérée (parcours par _ingested_at croissant). Renvoie le nombre
+    de documents déplacés par collection.
+    """
+    db = get_db()
+    moved = {}
+    for collection_name in sorted(db.list_collection_names()):
+        key = get_natural_key(collection_name)
+        if not key:
+            continue
+        collection = db[collection_name]
+        collection.create_index([("_ingested_at", 1)])
+        count = 0
+
+        def move(docs):
+            operations = []
+            for doc, new_id in zip(docs, natural_ids(docs, key)):
+                new_id = new_id or hash_record(doc)
+                if new_id == doc['_id']:
+                    continue
+                operations.append(ReplaceOne({'_id': new_id}, dict(doc, _id=new_id), upsert=True))
+                operations.append(DeleteOne({'_id': doc['_id']}))
+            if operations:
+                # Ordonné : la version la plus récente d'un document est écrite en dernier
+                collection.bulk_write(operations, ordered=True)
+            return len(operations) // 2
+
+        docs = []
+        for doc in collection.find({}, sort=[("_ingested_at", 1)]).batch_size(batch_size):
+            docs.append(doc)
+            if len(docs) >= batch_size:
+                count += move(docs)
+                docs = []
+        if docs:
+            count += move(docs)
+        moved[collection_name] = count
+        print(f"[LOG] Migration des _id de '{collection_name}' : {count} documents réécrits.")
+    return moved
 
 def main():
-    files = list(get_files(RAW_DIR))
+    parser = argparse.ArgumentParser(description="Ingestion des fichiers bruts dans MongoDB")
+    parser.add_argument("--raw-dir", default=RAW_DIR, help="répertoire des fichiers bruts")
+    parser.add_argument("--workers", type=int, default=FEEDER_WORKERS, help="processus d'ingestion parallèles")
+    parser.add_argument("--force", action="store_true", help="réingère tous les fichiers, même inchangés")
+    parser.add_argument(
+        "--migrate-ids", action="store_true",
+        help="réécrit les documents existants sous leur _id de clé naturelle, puis s'arrête",
+    )
+    args = parser.parse_args()
+
+    raw_dir = os.path.abspath(args.raw_dir)
+    if not check_connection():
+        exit(1)
+    if args.migrate_ids:
+        migrate_ids()
+        return
+    print(f"[LOG] Recherche dans : {raw_dir}")
+
+    files = list(get_files(raw_dir))
     if not files:
-        print(f"[LOG] Aucun fichier .csv/.json trouvé dans {RAW_DIR}")
+        print(f"[LOG] Aucun fichier .csv/.json trouvé dans {raw_dir}")
         return
 
-    for filepath in files:
-        collection_name = get_collection_name(filepath)
-        data = load_data(filepath)
-        insert_data(collection_name, data)
+    # Les plus gros fichiers d'abord : ils bornent la durée totale
+    files.sort(key=os.path.getsize, reverse=True)
+
+    totals = {}
+    volume = {"ingested": [0, 0], "skipped": [0, 0]}
+    def add_totals(collection_name, counts, size, skipped):
+        volume["skipped" if skipped else "ingested"][0] += 1
+        volume["skipped" if skipped else "ingested"][1] += size
+        if skipped:
+            return
+        collection_totals = totals.setdefault(
+            collection_name, {"inserted": 0, "matched": 0, "updated": 0, "unchanged": 0, "errors": 0}
+        )
+        for key, value in counts.items():
+            collection_totals[key] += value
+
+    workers = max(1, min(args.workers, len(files)))
+    if workers == 1:
+        for filepath in files:
+            add_totals(*ingest_file(filepath, raw_dir, args.force))
+    else:
+        print(f"[LOG] Ingestion de {len(files)} fichiers sur {workers} processus")
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+            futures = {
+                executor.submit(ingest_file, filepath, raw_dir, args.force): filepath
+                for filepath in files
+            }
+            for future in as_completed(futures):
+                try:
+                    add_totals(*future.result())
+                except Exception as e:
+                    print(f"[ERREUR] Ingestion de {futures[future]} : {e}")
+
+    for collection_name, counts in totals.items():
+        print(
+            f"[LOG] Bilan '{collection_name}' : {counts['inserted']} nouveaux, "
+            f"{counts['unchanged']} inchangés, {counts['updated']} mis à jour, "
+            f"{counts['errors']} en erreur."
+        )
+    (ingested, ingested_bytes), (skipped, skipped_bytes) = volume["ingested"], volume["skipped"]
+    print(
+        f"[LOG] Fichiers ingérés : {ingested} ({ingested_bytes / 1e6:.1f} Mo), "
+        f"ignorés car inchangés : {skipped} ({skipped_bytes / 1e6:.1f} Mo)."
+    )
 
 if __name__ == "__main__":
     main()
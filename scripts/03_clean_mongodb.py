@@ -1,349 +1,959 @@
 import os
+import json
+import time
+import glob
+import shutil
+import argparse
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from datetime import datetime
 from loguru import logger
 from pymongo import MongoClient
 from dotenv import load_dotenv
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
+from html import unescape
 import re
+from collections import Counter
 load_dotenv()
 
 CLEAN_DATA_DIR = "datasets_clean"
 os.makedirs(CLEAN_DATA_DIR, exist_ok=True)
 
+# États persistants entre deux nettoyages (watermarks par collection)
+STATE_DIR = f"{CLEAN_DATA_DIR}/.state"
+
+# Format des sorties : parquet (typé, un jeu par source partitionné par date de
+# collecte) ou csv (un fichier par source)
+CLEAN_FORMAT = os.getenv("CLEAN_FORMAT", "parquet")
+
+# Schéma fixe de chaque sortie de la zone Parquet : listes natives, catégories
+# encodées en dictionnaire, horodatages à la microseconde. Chaque morceau y est
+# converti, quel que soit le type que pandas aurait déduit de ses seules valeurs.
+_TEXT = pa.string()
+_CATEGORY = pa.dictionary(pa.int32(), pa.string())
+_TAGS = pa.list_(pa.string())
+_UTC = pa.timestamp("us", tz="UTC")
+_LOCAL = pa.timestamp("us")
+JOBSPY_SCHEMA = pa.schema([
+    ("doc_id", _TEXT), ("id", _TEXT), ("site", _CATEGORY), ("title", _TEXT), ("company", _TEXT),
+    ("company_industry", _TEXT), ("location", _TEXT), ("date_posted", _LOCAL), ("job_type", _CATEGORY),
+    ("is_remote", pa.bool_()), ("search_keyword", _CATEGORY), ("target_country", _CATEGORY),
+    ("min_amount", pa.float64()), ("max_amount", pa.float64()), ("currency", _CATEGORY),
+    ("interval", _CATEGORY), ("scraped_at", _LOCAL), ("description_text", _TEXT), ("skills", _TAGS),
+    ("salary_avg", pa.float64()),
+])
+CLEAN_SCHEMAS = {
+    "adzuna_jobs_clean": pa.schema([
+        ("doc_id", _TEXT), ("country", _CATEGORY), ("query", _CATEGORY), ("title", _TEXT),
+        ("company", _TEXT), ("location", _TEXT), ("description", _TEXT), ("salary_min", pa.float64()),
+        ("salary_max", pa.float64()), ("created", _UTC), ("scraped_at", _LOCAL),
+        ("country_name", _CATEGORY), ("skills", _TAGS), ("salary_avg", pa.float64()),
+    ]),
+    "indeed_jobs_clean": JOBSPY_SCHEMA,
+    "linkedin_jobs_clean": JOBSPY_SCHEMA,
+    "github_trends_clean": pa.schema([
+        ("doc_id", _TEXT), ("language", _CATEGORY), ("name", _TEXT), ("full_name", _TEXT),
+        ("owner_location", _TEXT), ("stars", pa.int64()), ("forks", pa.int64()), ("created_at", _UTC),
+        ("updated_at", _UTC), ("scraped_at", _LOCAL), ("popularity_score", pa.float64()),
+    ]),
+    "google_trends_clean": pa.schema([
+        ("doc_id", _TEXT), ("keyword", _CATEGORY), ("date", _LOCAL),
+        ("interest_value", pa.float64()), ("scraped_at", _LOCAL),
+    ]),
+    # Une sortie par édition : stackoverflow_survey_<année>_clean
+    "stackoverflow_survey_clean": pa.schema([
+        ("doc_id", _TEXT), ("SurveyYear", pa.int16()), ("Country", _CATEGORY),
+        ("LanguageHaveWorkedWith", _TEXT), ("CompTotal", pa.float64()), ("Currency", _CATEGORY),
+        ("DevType", _TEXT), ("YearsCodePro", _TEXT), ("Employment", _CATEGORY), ("EdLevel", _CATEGORY),
+        ("languages_list", _TAGS),
+    ]),
+    "job_offers_canonical": pa.schema([
+        ("source", _CATEGORY), ("doc_id", _TEXT), ("canonical_offer_id", _TEXT),
+    ]),
+}
+
+# Processus de nettoyage parallèles (une source par processus)
+CLEAN_WORKERS = int(os.getenv("CLEAN_WORKERS", min(4, os.cpu_count() or 1)))
+
 logger.remove()
-logger.add(f"{CLEAN_DATA_DIR}/cleaning.log", level="INFO", rotation="1 day")
+# enqueue : les processus du pool écrivent dans le même journal sans s'entremêler
+logger.add(f"{CLEAN_DATA_DIR}/cleaning.log", level="INFO", rotation="1 day", enqueue=True)
 
 load_dotenv()
 uri = os.getenv("MONGO_URI")
-if not uri:
-    logger.error("La variable d'environnement MONGO_URI est manquante.")
-    exit(1)
-try:
-    client = MongoClient(uri)
-    db = client["jobtech"]
-    client.server_info()
-    logger.info("Connexion MongoDB réussie.")
-except Exception as e:
-    logger.error(f"Échec de connexion à MongoDB : {e}")
-    exit(1)
-
-def clean_adzuna_jobs():
-    logger.info("Nettoyage des données Adzuna")
 
-    df = pd.DataFrame(list(db["adzuna_jobs"].find()))
-    df.drop(columns=["_id"], inplace=True, errors="ignore")
-    logger.info(f"Lignes initiales : {len(df)}")
-
-    country_mapping = {
-        "fr": "France",
-        "de": "Germany",
-        "nl": "Netherlands",
-        "es": "Spain",
-        "it": "Italy",
-        "at": "Austria",
-        "be": "Belgium",
-        "ch": "Switzerland",
-        "pl": "Poland",
-    }
-    df["country_name"] = df["country"].map(country_mapping)
-
-    def extract_skills(title):
-        if not title:
-            return []
-        title_lower = title.lower()
-        skills = []
-        if "python" in title_lower:
-            skills.append("Python")
-        if "javascript" in title_lower or "js" in title_lower:
-            skills.append("JavaScript")
-        if "react" in title_lower:
-            skills.append("React")
-        if "java" in title_lower and "javascript" not in title_lower:
-            skills.append("Java")
-        if "node" in title_lower:
-            skills.append("Node.js")
-        return skills
-
-    df["skills"] = df["title"].apply(extract_skills)
+_client = None
+
+def get_db():
+    """Base jobtech, via un client créé à la demande (un par processus)"""
+    global _client
+    if _client is None:
+        _client = MongoClient(uri)
+    return _client["jobtech"]
+
+def check_connection():
+    if not uri:
+        logger.error("La variable d'environnement MONGO_URI est manquante.")
+        return False
+    try:
+        get_db().client.server_info()
+        logger.info("Connexion MongoDB réussie.")
+        return True
+    except Exception as e:
+        logger.error(f"Échec de connexion à MongoDB : {e}")
+        return False
+
+def init_worker():
+    # Un client hérité du processus parent n'est pas utilisable après un fork
+    global _client
+    _client = None
+
+# Pays européens retenus pour l'enquête Stack Overflow
+EU_COUNTRIES = ["Germany", "France", "Netherlands", "Spain", "Italy", "Poland", "Switzerland", "Austria", "Belgium"]
+
+ADZUNA_COUNTRIES = {
+    "fr": "France",
+    "de": "Germany",
+    "nl": "Netherlands",
+    "es": "Spain",
+    "it": "Italy",
+    "at": "Austria",
+    "be": "Belgium",
+    "ch": "Switzerland",
+    "pl": "Poland",
+}
+
+NON_EMPTY = {"$nin": [None, ""]}
+
+# Documents lus par morceau : la mémoire du nettoyage ne dépend pas de la taille du lac
+CLEAN_CHUNK_SIZE = int(os.getenv("CLEAN_CHUNK_SIZE", 5000))
+
+# Extraction du texte des descriptions HTML : processus dédiés (1 : dans le
+# processus du nettoyeur) et descriptions envoyées par lot à chacun
+HTML_WORKERS = int(os.getenv("HTML_WORKERS", min(4, os.cpu_count() or 1)))
+HTML_BATCH_SIZE = int(os.getenv("HTML_BATCH_SIZE", 250))
+
+# Déduplication des offres entre sources : similarité minimale (Jaccard estimé
+# sur les 3-grammes de titre + entreprise + ville) pour deux annonces d'une même offre
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", 0.7))
+
+JOBSPY_FIELDS = [
+    "id", "site", "title", "company", "company_industry", "location", "date_posted",
+    "job_type", "is_remote", "search_keyword", "target_country", "description",
+    "min_amount", "max_amount", "currency", "interval", "scraped_at",
+]
+
+# Lecture du lac : chaque nettoyeur déclare les champs dont il a besoin, les
+# filtres évalués par MongoDB et l'index qui les sert
+READ_SPECS = {
+    "adzuna_jobs": {
+        "fields": [
+            "country", "query", "title", "company", "location", "description",
+            "salary_min", "salary_max", "created", "scraped_at",
+        ],
+        "filter": {
+            "country": {"$in": list(ADZUNA_COUNTRIES)},
+            "query": NON_EMPTY,
+            "title": NON_EMPTY,
+            "company": NON_EMPTY,
+            "location": NON_EMPTY,
+            "description": NON_EMPTY,
+        },
+        "index": [("country", 1)],
+    },
+    "github_trends": {
+        "fields": [
+            "language", "name", "full_name", "owner_location", "stars", "forks",
+            "created_at", "updated_at", "scraped_at",
+        ],
+    },
+    "google_trends": {
+        "fields": ["keyword", "interest_over_time", "scraped_at"],
+    },
+    # Toutes les éditions (collections stackoverflow_survey_<année>)
+    "stackoverflow_survey": {
+        "fields": [
+            "SurveyYear", "Country", "LanguageHaveWorkedWith", "CompTotal", "Currency",
+            "DevType", "YearsCodePro", "Employment", "EdLevel",
+        ],
+        "filter": {
+            "Country": {"$in": EU_COUNTRIES},
+            "CompTotal": {"$gt": 10000, "$lt": 500000},
+        },
+        "index": [("Country", 1), ("CompTotal", 1)],
+    },
+    "indeed_jobs": {
+        "fields": JOBSPY_FIELDS,
+        "filter": {"title": NON_EMPTY, "company": NON_EMPTY},
+    },
+    "linkedin_jobs": {
+        "fields": JOBSPY_FIELDS,
+        "filter": {"title": NON_EMPTY, "company": NON_EMPTY},
+    },
+}
+
+# Une collection du lac par édition du survey
+SURVEY_COLLECTION = re.compile(r"stackoverflow_survey_(\d{4})")
+
+# Identifiant MongoDB du document d'origine, conservé dans les sorties pour
+# fusionner les nettoyages incrémentaux
+DOC_ID = "doc_id"
+
+def read_spec(name):
+    """Spécification de lecture de la collection, ou de sa famille (stackoverflow_survey_<année>)"""
+    return READ_SPECS.get(name) or READ_SPECS[name.rsplit("_", 1)[0]]
+
+def survey_collections():
+    """Éditions du survey présentes dans le lac : {année: collection}"""
+    names = sorted(get_db().list_collection_names())
+    return {int(match.group(1)): name for name in names if (match := SURVEY_COLLECTION.fullmatch(name))}
+
+def find_collection(name, since=None):
+    """Curseur sur les seuls documents et champs utiles au nettoyage de la collection.
+
+    Avec since, seuls les documents écrits par le feeder après ce watermark
+    (_ingested_at) sont lus.
+    """
+    spec = read_spec(name)
+    collection = get_db()[name]
+    if spec.get("index"):
+        collection.create_index(spec["index"])
+    query = dict(spec.get("filter", {}))
+    if since is not None:
+        collection.create_index([("_ingested_at", 1)])
+        query["_ingested_at"] = {"$gt": since}
+    projection = {field: 1 for field in spec["fields"]}
+    projection["_ingested_at"] = 1
+    return collection.find(query, projection)
+
+# Référentiel des compétences : source de dim_skills.csv et du tagger.
+# Les synonymes sont cherchés en minuscules, en mots entiers.
+SKILLS_DIMENSION = [
+    {"skill_group": "Programming Language", "tech_label": "Python", "synonyms": ["python"]},
+    {"skill_group": "Programming Language", "tech_label": "JavaScript", "synonyms": ["javascript", "js"]},
+    {"skill_group": "Programming Language", "tech_label": "Java", "synonyms": ["java"]},
+    {"skill_group": "Framework", "tech_label": "React", "synonyms": ["react", "reactjs", "react.js"]},
+    {"skill_group": "Runtime", "tech_label": "Node.js", "synonyms": ["node.js", "nodejs", "node"]},
+    {"skill_group": "Programming Language", "tech_label": "Go", "synonyms": ["golang", "go developer"]},
+    {"skill_group": "Programming Language", "tech_label": "Rust", "synonyms": ["rust"]},
+    {"skill_group": "Programming Language", "tech_label": "TypeScript", "synonyms": ["typescript"]},
+    {"skill_group": "Field", "tech_label": "Data Science", "synonyms": ["data science", "data scientist"]},
+    {"skill_group": "Framework", "tech_label": "Angular", "synonyms": ["angular", "angularjs"]},
+    {"skill_group": "Field", "tech_label": "Full Stack", "synonyms": ["full stack", "full-stack", "fullstack"]},
+]
+
+SKILL_SYNONYMS = {synonym: skill["tech_label"] for skill in SKILLS_DIMENSION for synonym in skill["synonyms"]}
+SKILL_ORDER = {skill["tech_label"]: i for i, skill in enumerate(SKILLS_DIMENSION)}
+
+def build_skill_pattern(synonyms):
+    """Une seule alternance RE2 de tous les synonymes, les plus longs d'abord
+    (« node.js » avant « node », « react.js » avant « js »)"""
+    return "|".join(
+        (r"\b" if synonym[0].isalnum() else "") + re.escape(synonym) + (r"\b" if synonym[-1].isalnum() else "")
+        for synonym in sorted(synonyms, key=len, reverse=True)
+    )
+
+SKILL_PATTERN = build_skill_pattern(SKILL_SYNONYMS)
+
+def tag_skills(*columns):
+    """Compétences citées dans les colonnes texte (titre, description...).
+
+    L'alternance est compilée en automate par RE2 : une seule passe par ligne,
+    quel que soit le nombre de compétences du référentiel. Chaque occurrence
+    est isolée entre deux séparateurs, puis les segments qui sont exactement
+    un synonyme sont ramenés à leur libellé. Renvoie une liste par ligne,
+    dans l'ordre du référentiel.
+    """
+    index = columns[0].index
+    parts = [pa.array(col.astype(object).where(col.notna(), ""), type=pa.string()) for col in columns]
+    text = pc.utf8_lower(pc.binary_join_element_wise(*parts, "\n"))
+
+    segments = pc.split_pattern(pc.replace_substring_regex(text, SKILL_PATTERN, "\x00\\0\x00"), "\x00")
+    flat = pc.list_flatten(segments)
+    found = pc.is_in(flat, value_set=pa.array(list(SKILL_SYNONYMS)))
+    tags = pd.DataFrame({
+        "row": pc.filter(pc.list_parent_indices(segments), found).to_numpy(),
+        "skill": pc.filter(flat, found).to_pandas().astype(object).map(SKILL_SYNONYMS),
+    }).drop_duplicates()
+    tags["order"] = tags["skill"].map(SKILL_ORDER)
+    by_row = tags.sort_values(["row", "order"]).groupby("row")["skill"].agg(list)
+
+    skills = by_row.reindex(range(len(index)))
+    return pd.Series([value if isinstance(value, list) else [] for value in skills], index=index, dtype=object)
+
+def load_state(name, default):
+    """Lit un état persistant JSON de STATE_DIR"""
+    try:
+        with open(f"{STATE_DIR}/{name}.json", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def save_state(name, data):
+    """Écrit un état persistant JSON de manière atomique"""
+    os.makedirs(STATE_DIR, exist_ok=True)
+    path = f"{STATE_DIR}/{name}.json"
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(f"{path}.tmp", path)
+
+def iter_chunks(name, since=None, chunk_size=CLEAN_CHUNK_SIZE):
+    """DataFrames successifs de chunk_size documents, lus au fil du curseur.
+
+    Chaque morceau porte en plus DOC_ID et _ingested_at.
+    """
+    columns = ["_id", "_ingested_at"] + read_spec(name)["fields"]
+    batch = []
+    for doc in find_collection(name, since).batch_size(chunk_size):
+        batch.append(doc)
+        if len(batch) >= chunk_size:
+            yield pd.DataFrame(batch, columns=columns).rename(columns={"_id": DOC_ID})
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch, columns=columns).rename(columns={"_id": DOC_ID})
+
+def write_chunk(df, filename, append):
+    """Écrit un morceau nettoyé : en-tête au premier morceau, ajout ensuite"""
+    df.to_csv(
+        f"{CLEAN_DATA_DIR}/{filename}", mode="a" if append else "w",
+        header=not append, index=False, encoding="utf-8",
+    )
 
+def output_schema(output):
+    """Schéma Parquet d'une sortie"""
+    return CLEAN_SCHEMAS.get(output) or CLEAN_SCHEMAS[re.sub(r"_\d{4}_clean$", "_clean", output)]
+
+def to_arrow_column(values, type):
+    """Colonne pandas convertie vers le type Arrow demandé (valeurs manquantes -> null)"""
+    if pa.types.is_dictionary(type):
+        return to_arrow_column(values, type.value_type).dictionary_encode()
+    if pa.types.is_list(type):
+        return pa.array(
+            [list(value) if isinstance(value, (list, np.ndarray)) else None for value in values], type=type
+        )
+    if pa.types.is_timestamp(type):
+        # Horodatages sans fuseau lus comme UTC, puis ramenés au fuseau du schéma
+        stamps = pd.to_datetime(values, errors="coerce", utc=True)
+        if type.tz is None:
+            stamps = stamps.dt.tz_localize(None)
+        return pa.array(stamps, from_pandas=True).cast(type, safe=False)
+    if pa.types.is_string(type) or pa.types.is_boolean(type):
+        objects = values.astype(object)
+        if pa.types.is_string(type):
+            objects = objects.where(objects.isna(), objects.astype(str))
+        return pa.array(objects.where(objects.notna(), None), type=type)
+    return pa.array(pd.to_numeric(values, errors="coerce"), from_pandas=True).cast(type)
+
+def to_arrow(df, schema):
+    """Table Arrow au schéma fixe de la sortie, pour que tous les fichiers d'un
+    jeu aient les mêmes types : un morceau entièrement vide ou sans décimales
+    ne change pas le type de ses colonnes"""
+    extra = [col for col in df.columns if col not in schema.names]
+    if extra:
+        raise ValueError(f"Colonnes absentes du schéma de sortie : {extra}")
+    columns = []
+    for field in schema:
+        values = df[field.name] if field.name in df.columns else pd.Series(None, index=df.index, dtype=object)
+        columns.append(to_arrow_column(values, field.type))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+def parquet_files(output):
+    return sorted(glob.glob(f"{CLEAN_DATA_DIR}/{output}/**/*.parquet", recursive=True))
+
+def write_parquet_chunk(df, output, part):
+    """Écrit un morceau dans le jeu Parquet de la source, un fichier par date de collecte"""
+    directory = f"{CLEAN_DATA_DIR}/{output}"
+    os.makedirs(directory, exist_ok=True)
+    if "scraped_at" in df.columns:
+        dates = pd.to_datetime(df["scraped_at"], errors="coerce").dt.strftime("%Y-%m-%d").fillna("unknown")
+        partitions = df.groupby(dates.to_numpy(), sort=False)
+    else:
+        partitions = [(None, df)]
+    for date, rows in partitions:
+        partition = directory if date is None else f"{directory}/scrape_date={date}"
+        os.makedirs(partition, exist_ok=True)
+        pq.write_table(to_arrow(rows, output_schema(output)), f"{partition}/{part}.parquet")
+
+def write_output(df, output, i, run_id, incremental=False):
+    """Écrit le i-ème morceau nettoyé d'une sortie (à part pour un nettoyage incrémental en CSV)"""
+    if CLEAN_FORMAT == "csv":
+        write_chunk(df, f"{output}.csv.new" if incremental else f"{output}.csv", append=i > 0)
+    else:
+        write_parquet_chunk(df, output, f"{run_id}-{i:05d}")
+
+def write_empty_output(output, run_id):
+    """Écrit une sortie sans lignes, avec les colonnes du schéma de la sortie"""
+    schema = output_schema(output)
+    if CLEAN_FORMAT == "csv":
+        write_chunk(pd.DataFrame(columns=schema.names), f"{output}.csv", append=False)
+    else:
+        os.makedirs(f"{CLEAN_DATA_DIR}/{output}", exist_ok=True)
+        pq.write_table(schema.empty_table(), f"{CLEAN_DATA_DIR}/{output}/{run_id}-00000.parquet")
+
+def output_columns(output):
+    """Colonnes de la sortie existante, None si elle n'existe pas"""
+    if CLEAN_FORMAT == "csv":
+        path = f"{CLEAN_DATA_DIR}/{output}.csv"
+        return list(pd.read_csv(path, nrows=0).columns) if os.path.exists(path) else None
+    files = parquet_files(output)
+    return pq.read_schema(files[0]).names if files else None
+
+def get_watermark(name, output, full_rebuild=False):
+    """Watermark à partir duquel reprendre le nettoyage, ou None pour tout reconstruire"""
+    watermark = load_state(f"{name}_watermark", {}).get("ingested_at")
+    if full_rebuild or not watermark:
+        return None
+    columns = output_columns(output)
+    if columns is None:
+        return None
+    if DOC_ID not in columns:
+        logger.warning(f"{output} ne porte pas de colonne {DOC_ID} : reconstruction complète")
+        return None
+    return datetime.fromisoformat(watermark)
+
+def merge_csv_output(output, doc_ids):
+    """Fusionne les lignes d'un nettoyage incrémental dans le CSV existant.
+
+    Les lignes issues de documents relus (réécrits depuis par le feeder) sont
+    remplacées, les autres conservées telles quelles ; les nouvelles lignes
+    sont ajoutées à la fin. Renvoie le nombre de lignes remplacées.
+    """
+    filename = f"{output}.csv"
+    path, new_path = f"{CLEAN_DATA_DIR}/{filename}", f"{CLEAN_DATA_DIR}/{filename}.new"
+    header = pd.read_csv(path, nrows=0).columns
+    read_text = {"dtype": str, "keep_default_na": False, "chunksize": CLEAN_CHUNK_SIZE}
+
+    replaced = int(pd.read_csv(path, usecols=[DOC_ID], dtype=str)[DOC_ID].isin(doc_ids).sum())
+    if replaced:
+        for i, part in enumerate(pd.read_csv(path, **read_text)):
+            write_chunk(part[~part[DOC_ID].isin(doc_ids)], f"{filename}.tmp", append=i > 0)
+        os.replace(f"{path}.tmp", path)
+
+    if os.path.exists(new_path):
+        for part in pd.read_csv(new_path, **read_text):
+            write_chunk(part.reindex(columns=header), filename, append=True)
+        os.remove(new_path)
+    return replaced
+
+def merge_parquet_output(output, run_id, doc_ids):
+    """Retire des fichiers Parquet antérieurs les lignes des documents relus.
+
+    Les nouvelles lignes sont déjà écrites dans leurs partitions ; seule la
+    colonne DOC_ID des fichiers existants est lue, et seuls les fichiers
+    concernés sont réécrits. Renvoie le nombre de lignes remplacées.
+    """
+    replaced = 0
+    for path in parquet_files(output):
+        if os.path.basename(path).startswith(run_id):
+            continue
+        ids = pq.read_table(path, columns=[DOC_ID]).column(DOC_ID).cast(pa.string())
+        stale = pc.is_in(ids, value_set=pa.array(list(doc_ids), type=pa.string()))
+        count = pc.sum(stale).as_py() or 0
+        if not count:
+            continue
+        replaced += count
+        kept = pq.read_table(path).filter(pc.invert(stale))
+        if kept.num_rows:
+            pq.write_table(kept, f"{path}.tmp")
+            os.replace(f"{path}.tmp", path)
+        else:
+            os.remove(path)
+    return replaced
+
+def clean_in_chunks(name, output, transform, full_rebuild=False):
+    """Applique transform à chaque morceau de la collection et écrit la sortie au fil de l'eau.
+
+    Seuls les documents écrits depuis le dernier watermark de la collection
+    sont nettoyés et fusionnés dans la sortie existante ; full_rebuild (ou
+    l'absence de watermark) relit toute la collection et réécrit la sortie.
+    Renvoie (documents lus, lignes écrites).
+    """
+    since = get_watermark(name, output, full_rebuild)
+    run_id = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    if since:
+        logger.info(f"{name} : nettoyage incrémental depuis {since.isoformat()}")
+    elif CLEAN_FORMAT != "csv":
+        shutil.rmtree(f"{CLEAN_DATA_DIR}/{output}", ignore_errors=True)
+
+    read = written = 0
+    watermark, doc_ids = None, set()
+    for i, chunk in enumerate(iter_chunks(name, since)):
+        read += len(chunk)
+        stamps = pd.to_datetime(chunk.pop("_ingested_at"), errors="coerce").dropna()
+        if len(stamps) and (watermark is None or stamps.max() > watermark):
+            watermark = stamps.max()
+        doc_ids.update(chunk[DOC_ID].astype(str))
+
+        cleaned = transform(chunk)
+        write_output(cleaned, output, i, run_id, incremental=since is not None)
+        written += len(cleaned)
+
+    if since:
+        if read:
+            if CLEAN_FORMAT == "csv":
+                replaced = merge_csv_output(output, doc_ids)
+            else:
+                replaced = merge_parquet_output(output, run_id, doc_ids)
+            logger.info(f"{name} : {written} lignes fusionnées dans {output}, dont {replaced} remplacées")
+        else:
+            logger.info(f"{name} : aucun nouveau document depuis le dernier nettoyage")
+    elif not written:
+        # Sortie vide mais présente : le chargement ne doit pas retomber sur d'anciens fichiers
+        logger.warning(f"{name} : aucune ligne nettoyée ({read} documents lus), sortie {output} vide")
+        write_empty_output(output, run_id)
+
+    if watermark is not None:
+        save_state(f"{name}_watermark", {
+            "ingested_at": watermark.to_pydatetime().isoformat(),
+            "cleaned_at": datetime.now().isoformat(),
+        })
+    elif read and not since:
+        logger.warning(f"{name} : documents sans _ingested_at, le prochain nettoyage sera complet")
+    return read, written
+
+# Règles de validité : chaque test renvoie True pour les valeurs valides
+EMPTY_VALUES = ["", "[]", "['']"]
+VALIDITY_CHECKS = {
+    "not_null": lambda col: col.notna(),
+    "not_empty": lambda col: ~col.isin(EMPTY_VALUES),
+    "not_empty_list": lambda col: col.str.join("").str.len().fillna(0) > 0,
+}
+
+ADZUNA_TEXT_COLUMNS = ["country", "query", "title", "company", "location", "description", "country_name"]
+SURVEY_TEXT_COLUMNS = ["Country", "LanguageHaveWorkedWith", "Currency", "DevType", "YearsCodePro", "Employment", "EdLevel"]
+
+# Règle -> colonnes couvertes, par source
+VALIDITY_RULES = {
+    "adzuna_jobs": {
+        "not_null": ADZUNA_TEXT_COLUMNS,
+        "not_empty": ADZUNA_TEXT_COLUMNS,
+        "not_empty_list": ["skills"],
+    },
+    "stackoverflow_survey": {
+        "not_null": SURVEY_TEXT_COLUMNS,
+        "not_empty": SURVEY_TEXT_COLUMNS,
+    },
+    "jobspy": {
+        "not_null": ["title", "company"],
+        "not_empty": ["title", "company"],
+        "not_empty_list": ["skills"],
+    },
+}
+
+def apply_validity(df, rules, rejections):
+    """Filtre df en une seule fois selon des règles déclaratives.
+
+    Les tests de chaque règle sont combinés en un masque unique ; rejections
+    (Counter) cumule les lignes rejetées par règle et colonne, une ligne
+    n'étant comptée que pour la première règle qu'elle enfreint.
+    """
+    valid = pd.Series(True, index=df.index)
+    for rule, columns in rules.items():
+        check = VALIDITY_CHECKS[rule]
+        for col in columns:
+            if col not in df.columns:
+                continue
+            ok = check(df[col]).to_numpy(dtype=bool)
+            rejections[f"{rule}({col})"] += int((valid & ~ok).sum())
+            valid &= ok
+    return df[valid]
+
+def log_rejections(source, rejections):
+    counts = ", ".join(f"{rule}={count}" for rule, count in rejections.items() if count)
+    logger.info(f"{source} : lignes rejetées par règle : {counts or 'aucune'}")
+
+# Bornes des salaires Adzuna plausibles, partagées par le filtre des lots et
+# le calcul des médianes dans MongoDB
+ADZUNA_SALARY_FIELDS = ("salary_min", "salary_max")
+ADZUNA_MIN_SALARY = 10000
+
+def filter_adzuna_salaries(df):
     df["salary_min"] = pd.to_numeric(df["salary_min"], errors="coerce")
     df["salary_max"] = pd.to_numeric(df["salary_max"], errors="coerce")
 
-    df = df[(df["salary_min"].isna()) | (df["salary_min"] >= 10000)]
-    df = df[(df["salary_max"].isna()) | (df["salary_max"] >= 10000)]
+    df = df[(df["salary_min"].isna()) | (df["salary_min"] >= ADZUNA_MIN_SALARY)]
+    df = df[(df["salary_max"].isna()) | (df["salary_max"] >= ADZUNA_MIN_SALARY)]
+    return df
 
-    if df["salary_min"].notna().sum() > 0:
-        median_min = df["salary_min"].median()
-        df["salary_min"] = df["salary_min"].fillna(median_min)
+def adzuna_salary_query():
+    """Filtre MongoDB équivalent à filter_adzuna_salaries : chaque salaire est absent
+    (champ manquant, null, NaN ou non numérique) ou au moins ADZUNA_MIN_SALARY"""
+    return {"$and": [
+        {"$or": [
+            {field: {"$not": {"$gte": float("-inf")}}},
+            {field: {"$gte": ADZUNA_MIN_SALARY}},
+        ]}
+        for field in ADZUNA_SALARY_FIELDS
+    ]}
 
-    if df["salary_max"].notna().sum() > 0:
-        median_max = df["salary_max"].median()
-        df["salary_max"] = df["salary_max"].fillna(median_max)
+def collection_median(collection, query, field):
+    """Médiane d'un champ numérique calculée par MongoDB : comptage, puis tri sur
+    l'index du champ et lecture des seules valeurs centrales ; NaN si aucune valeur"""
+    query = {"$and": [query, {field: {"$gte": float("-inf")}}]}
+    count = collection.count_documents(query)
+    if not count:
+        return float("nan")
+    cursor = (
+        collection.find(query, {field: 1, "_id": 0})
+        .sort(field, 1)
+        .skip((count - 1) // 2)
+        .limit(2 - count % 2)
+    )
+    values = [doc[field] for doc in cursor]
+    return sum(values) / len(values)
 
-    df["salary_avg"] = (df["salary_min"] + df["salary_max"]) / 2
+def adzuna_salary_medians():
+    """Première passe : médianes des salaires, calculées par MongoDB.
 
-    df["created"] = pd.to_datetime(df["created"], errors="coerce")
-    df["scraped_at"] = pd.to_datetime(df["scraped_at"], errors="coerce")
+    Comme avant le découpage, elles portent sur toutes les offres aux salaires
+    plausibles, y compris celles écartées ensuite par les filtres de texte. Les
+    salaires Adzuna sont stockés en nombres ; une valeur texte compte comme absente.
+    """
+    collection = get_db()["adzuna_jobs"]
+    query = adzuna_salary_query()
+    medians = []
+    for field in ADZUNA_SALARY_FIELDS:
+        collection.create_index([(field, 1)])
+        medians.append(collection_median(collection, query, field))
+    return tuple(medians)
 
-    cat_cols = [
-        "country", "query", "title", "company", "location",
-        "description", "country_name", "skills"
-    ]
-    cat_cols = [col for col in cat_cols if col in df.columns]
+def clean_adzuna_jobs(full_rebuild=False):
+    logger.info("Nettoyage des données Adzuna")
+
+    median_min, median_max = adzuna_salary_medians()
+    rejections = Counter()
 
-    for col in cat_cols:
-        df = df[~df[col].isna()]
-        df = df[df[col] != ""]
-        df = df[df[col].astype(str) != "[]"]
-        df = df[df[col].astype(str) != "['']"]
+    def transform(df):
+        df["country_name"] = df["country"].map(ADZUNA_COUNTRIES)
+        df["skills"] = tag_skills(df["title"], df["description"])
 
-    logger.info(f"Lignes après nettoyage complet : {len(df)}")
+        df = filter_adzuna_salaries(df)
+        if pd.notna(median_min):
+            df["salary_min"] = df["salary_min"].fillna(median_min)
+        if pd.notna(median_max):
+            df["salary_max"] = df["salary_max"].fillna(median_max)
 
-    df.to_csv(f"{CLEAN_DATA_DIR}/adzuna_jobs_clean.csv", index=False, encoding="utf-8")
-    logger.info(f"Adzuna nettoyé: {len(df)} offres")
+        df["salary_avg"] = (df["salary_min"] + df["salary_max"]) / 2
 
-def clean_github_trends():
+        df["created"] = pd.to_datetime(df["created"], errors="coerce")
+        df["scraped_at"] = pd.to_datetime(df["scraped_at"], errors="coerce")
+
+        return apply_validity(df, VALIDITY_RULES["adzuna_jobs"], rejections)
+
+    read, written = clean_in_chunks("adzuna_jobs", "adzuna_jobs_clean", transform, full_rebuild)
+    logger.info(f"Lignes initiales : {read}")
+    log_rejections("Adzuna", rejections)
+    logger.info(f"Adzuna nettoyé: {written} offres")
+
+def clean_github_trends(full_rebuild=False):
     logger.info("Nettoyage des données GitHub")
-    df = pd.DataFrame(list(db["github_trends"].find()))
-    df.drop(columns=["_id"], inplace=True, errors="ignore")
-    df["created_at"] = pd.to_datetime(df["created_at"], errors="coerce")
-    df["updated_at"] = pd.to_datetime(df["updated_at"], errors="coerce")
-    df["scraped_at"] = pd.to_datetime(df["scraped_at"], errors="coerce")
-    df["stars"] = pd.to_numeric(df["stars"], errors="coerce").fillna(0)
-    df["forks"] = pd.to_numeric(df["forks"], errors="coerce").fillna(0)
-    df["popularity_score"] = df["stars"] * 0.7 + df["forks"] * 0.3
-    df.to_csv(f"{CLEAN_DATA_DIR}/github_trends_clean.csv", index=False, encoding="utf-8")
-    logger.info(f"GitHub nettoyé: {len(df)} repos")
 
-def clean_google_trends():
+    def transform(df):
+        df["created_at"] = pd.to_datetime(df["created_at"], errors="coerce")
+        df["updated_at"] = pd.to_datetime(df["updated_at"], errors="coerce")
+        df["scraped_at"] = pd.to_datetime(df["scraped_at"], errors="coerce")
+        df["stars"] = pd.to_numeric(df["stars"], errors="coerce").fillna(0)
+        df["forks"] = pd.to_numeric(df["forks"], errors="coerce").fillna(0)
+        df["popularity_score"] = df["stars"] * 0.7 + df["forks"] * 0.3
+        return df
+
+    _, written = clean_in_chunks("github_trends", "github_trends_clean", transform, full_rebuild)
+    logger.info(f"GitHub nettoyé: {written} repos")
+
+def clean_google_trends(full_rebuild=False):
     logger.info("Nettoyage des données Google Trends")
-    data = list(db["google_trends"].find())
-
-    trends_list = []
-    for item in data:
-        keyword = item.get("keyword")
-        for date_str, value in item.get("interest_over_time", {}).items():
-            trends_list.append({
-                "keyword": keyword,
-                "date": date_str,
-                "interest_value": value,
-                "scraped_at": item.get("scraped_at"),
-            })
-
-    df = pd.DataFrame(trends_list)
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df["scraped_at"] = pd.to_datetime(df["scraped_at"], errors="coerce")
-    df["interest_value"] = pd.to_numeric(df["interest_value"], errors="coerce")
 
-    df.to_csv(f"{CLEAN_DATA_DIR}/google_trends_clean.csv", index=False, encoding="utf-8")
-    logger.info(f"Google Trends nettoyé: {len(df)} points de données")
+    def transform(chunk):
+        trends_list = []
+        for doc_id, keyword, interest, scraped_at in zip(
+            chunk[DOC_ID], chunk["keyword"], chunk["interest_over_time"], chunk["scraped_at"]
+        ):
+            if not isinstance(interest, dict):
+                continue
+            for date_str, value in interest.items():
+                trends_list.append({
+                    DOC_ID: doc_id,
+                    "keyword": keyword,
+                    "date": date_str,
+                    "interest_value": value,
+                    "scraped_at": scraped_at,
+                })
+
+        df = pd.DataFrame(trends_list, columns=[DOC_ID, "keyword", "date", "interest_value", "scraped_at"])
+        df["date"] = pd.to_datetime(df["date"], errors="coerce")
+        df["scraped_at"] = pd.to_datetime(df["scraped_at"], errors="coerce")
+        df["interest_value"] = pd.to_numeric(df["interest_value"], errors="coerce")
+        return df
+
+    _, written = clean_in_chunks("google_trends", "google_trends_clean", transform, full_rebuild)
+    logger.info(f"Google Trends nettoyé: {written} points de données")
 
 
-def clean_stackoverflow_survey():
+def clean_stackoverflow_survey(full_rebuild=False):
+    """Nettoie chaque édition du survey vers sa sortie stackoverflow_survey_<année>_clean"""
     logger.info("Nettoyage des données Stack Overflow")
-    df = pd.DataFrame(list(db["stackoverflow_survey_2024"].find()))
-    df.drop(columns=["_id"], inplace=True, errors="ignore")
 
-    useful_cols = [
-        "Country", "LanguageHaveWorkedWith", "CompTotal", "Currency",
-        "DevType", "YearsCodePro", "Employment", "EdLevel"
-    ]
-    df = df[[col for col in useful_cols if col in df.columns]]
+    collections = survey_collections()
+    if not collections:
+        logger.warning("Aucune édition du Stack Overflow Survey dans MongoDB")
 
-    # Filtrage Europe uniquement
-    eu_countries = ["Germany", "France", "Netherlands", "Spain", "Italy", "Poland", "Switzerland", "Austria", "Belgium"]
-    df = df[df["Country"].isin(eu_countries)]
+    for year, name in collections.items():
+        rejections = Counter()
 
-    # Nettoyage CompTotal
-    if "CompTotal" in df.columns:
-        df["CompTotal"] = pd.to_numeric(df["CompTotal"], errors="coerce")
-        df = df[df["CompTotal"].notna()]
-        df = df[(df["CompTotal"] > 10000) & (df["CompTotal"] < 500000)]
+        # Colonnes utiles, filtrage Europe et bornes de salaire appliqués par MongoDB
+        def transform(df, year=year, rejections=rejections):
+            # Fichiers bruts antérieurs à la colonne SurveyYear : année de la collection
+            df["SurveyYear"] = pd.to_numeric(df["SurveyYear"], errors="coerce").fillna(year).astype("int16")
 
-    cat_cols = ["Country", "LanguageHaveWorkedWith", "Currency", "DevType", "YearsCodePro", "Employment", "EdLevel"]
-    cat_cols = [col for col in cat_cols if col in df.columns] 
+            # Nettoyage CompTotal
+            if "CompTotal" in df.columns:
+                df["CompTotal"] = pd.to_numeric(df["CompTotal"], errors="coerce")
+                df = df[df["CompTotal"].notna()]
+                df = df[(df["CompTotal"] > 10000) & (df["CompTotal"] < 500000)]
 
-    for col in cat_cols:
-        df = df[~df[col].isna()]                  
-        df = df[df[col] != ""]                        
-        df = df[df[col].astype(str) != "[]"]            
-        df = df[df[col].astype(str) != "['']"]           
+            df = apply_validity(df, VALIDITY_RULES["stackoverflow_survey"], rejections)
 
-    if "LanguageHaveWorkedWith" in df.columns:
-        df["languages_list"] = df["LanguageHaveWorkedWith"].fillna("").str.split(";")
+            if "LanguageHaveWorkedWith" in df.columns:
+                df["languages_list"] = df["LanguageHaveWorkedWith"].fillna("").str.split(";")
+            return df
 
-    df.to_csv(f"{CLEAN_DATA_DIR}/stackoverflow_survey_clean.csv", index=False, encoding="utf-8")
-    logger.info(f"Stack Overflow nettoyé: {len(df)} réponses")
+        _, written = clean_in_chunks(name, f"stackoverflow_survey_{year}_clean", transform, full_rebuild)
+        log_rejections(f"Stack Overflow {year}", rejections)
+        logger.info(f"Stack Overflow {year} nettoyé: {written} réponses")
 
 
-def clean_indeed_jobs():
-    logger.info("Nettoyage des données Indeed")
-    df = pd.DataFrame(list(db["indeed_jobs"].find()))
-    df.drop(columns=["_id"], inplace=True, errors="ignore")
-    logger.info(f"Lignes initiales : {len(df)}")
+# Balises dont la fin sépare deux blocs de texte (sans quoi « <li>Python</li><li>Java</li> »
+# donnerait « PythonJava »)
+HTML_BLOCK_TAGS = (
+    "p", "div", "br", "li", "ul", "ol", "tr", "td", "th", "table", "section",
+    "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre",
+)
 
-    df = df[df["title"].notna() & (df["title"] != "")]
-    df = df[df["company"].notna() & (df["company"] != "")]
-    df = df.drop_duplicates(subset=["id"], keep="first")
+# Repli quand lxml rejette le document (commentaire seul, déclaration XML avec
+# encodage...) : balises, commentaires et instructions retirés par expression régulière
+HTML_MARKUP = re.compile(
+    r"<(script|style)\b.*?</\1\s*>|<!--.*?(?:-->|$)|<\?.*?(?:\?>|$)|<!\[CDATA\[|\]\]>|<[^>]*>",
+    re.IGNORECASE | re.DOTALL,
+)
+
+def strip_markup(html):
+    return " ".join(unescape(HTML_MARKUP.sub(" ", html)).split())
+
+def html_to_text(html):
+    """Texte d'une description HTML, espaces normalisés.
+
+    Le document est analysé par lxml (libxml2) puis sérialisé en texte d'un
+    seul appel C ; seules les balises de bloc sont parcourues en Python.
+    """
+    if not isinstance(html, str) or not html.strip():
+        return ""
+    try:
+        root = lxml.html.fromstring(html)
+    except (etree.ParserError, ValueError):
+        return strip_markup(html)
+    etree.strip_elements(root, "script", "style", with_tail=False)
+    for element in root.iter(HTML_BLOCK_TAGS):
+        element.tail = "\n" + element.tail if element.tail else "\n"
+    return " ".join(etree.tostring(root, method="text", encoding="unicode").split())
+
+def _html_batch_to_text(batch):
+    return [html_to_text(html) for html in batch]
+
+_html_pool = None
+
+def html_to_text_column(descriptions):
+    """Texte de chaque description d'une colonne, lot par lot sur HTML_WORKERS processus"""
+    global _html_pool
+    values = descriptions.tolist()
+    if HTML_WORKERS <= 1 or len(values) <= HTML_BATCH_SIZE:
+        texts = _html_batch_to_text(values)
+    else:
+        if _html_pool is None:
+            _html_pool = ProcessPoolExecutor(max_workers=HTML_WORKERS)
+        batches = [values[i:i + HTML_BATCH_SIZE] for i in range(0, len(values), HTML_BATCH_SIZE)]
+        texts = [text for batch in _html_pool.map(_html_batch_to_text, batches) for text in batch]
+    return pd.Series(texts, index=descriptions.index, dtype=object)
+
+def shutdown_html_pool():
+    global _html_pool
+    if _html_pool is not None:
+        _html_pool.shutdown()
+        _html_pool = None
+
+
+# Extraction des salaires depuis les descriptions (texte en minuscules).
+# Motifs RE2 évalués par pyarrow sur toute la colonne, première occurrence par
+# ligne : chaque motif exige donc lui-même une devise, un « k », une période ou
+# un mot-clé, pour ne pas s'arrêter sur « 2-3 years ».
+_SALARY_SYMBOL = r"€|&euro;|\$|£|&pound;"
+_SALARY_CURRENCY = r"€|&euro;|euros?\b|eur\b|\$|usd\b|£|&pound;|gbp\b"
+# Milliers groupés, éventuellement suivis de centimes (« 35 537,79 »), ou nombre simple
+_SALARY_NUMBER = r"\d{1,3}(?:[ .,]\d{3})+(?:[.,]\d{1,2}\b)?|\d+(?:[.,]\d+)?"
+_SALARY_RANGE_SEP = r"\s*(?:-|–|to|à)\s*"
+_SALARY_PERIOD = (
+    r"[^\d.;]{{0,20}}?(?P<{}>per (?:year|annum|month|week|day|hour)|/\s?(?:year|yr|an|month|mo|mois|week|day|hour|hr)"
+    r"|annual(?:ly)?|yearly|monthly|weekly|daily|hourly|par (?:an|mois|jour|heure)|annuel|mensuel)"
+)
+SALARY_PATTERNS = [
+    # « €50k - €70k », « $89,000 to $139,000 », « €4516 per month »
+    rf"(?P<cur1>{_SALARY_SYMBOL})\s*(?P<min>{_SALARY_NUMBER})\s*(?P<k1>k\b)?"
+    rf"(?:{_SALARY_RANGE_SEP}(?:{_SALARY_SYMBOL})?\s*(?P<max>{_SALARY_NUMBER})\s*(?P<k2>k\b)?(?:{_SALARY_PERIOD.format('period')})?"
+    rf"|{_SALARY_PERIOD.format('period2')})",
+    # « 50k€ - 70k€ », « 45 000 - 55 000 € », « 50 - 70k »
+    rf"(?P<min>{_SALARY_NUMBER})\s*(?P<k1>k\b)?\s*(?P<cur1>{_SALARY_CURRENCY})?"
+    rf"{_SALARY_RANGE_SEP}(?P<max>{_SALARY_NUMBER})\s*(?:(?P<k2>k\b)\s*(?P<cur2>{_SALARY_CURRENCY})?|(?P<cur3>{_SALARY_CURRENCY}))"
+    rf"(?:{_SALARY_PERIOD.format('period')})?",
+    # « salary: 50k », « salaire : 35 537,79 € par an », « rémunération : 45 000 € brut annuel »
+    rf"(?:salaire|salar|compensation|r[ée]mun[ée]ration)[^\d€$£&]{{0,30}}?(?P<cur1>{_SALARY_SYMBOL})?"
+    rf"\s*(?P<min>{_SALARY_NUMBER})\s*(?P<k1>k\b)?\s*(?P<cur2>{_SALARY_CURRENCY})?(?:{_SALARY_PERIOD.format('period')})?",
+]
+SALARY_CURRENCIES = {
+    "€": "EUR", "&euro;": "EUR", "euro": "EUR", "euros": "EUR", "eur": "EUR",
+    "$": "USD", "usd": "USD", "£": "GBP", "&pound;": "GBP", "gbp": "GBP",
+}
+# Périodes au format JobSpy (colonne interval), testées dans l'ordre
+SALARY_PERIODS = [
+    ("hourly", r"hour|hr|heure"),
+    ("daily", r"day|jour"),
+    ("weekly", r"week"),
+    ("monthly", r"month|mo\b|mois|mensuel"),
+    ("yearly", r"year|yr|ann|an\b"),
+]
+SALARY_COLUMNS = ["min_amount", "max_amount", "currency", "interval"]
+
+def _extract_first(text, pattern):
+    """Groupes nommés de la première correspondance par ligne (NaN si aucune)"""
+    matches = pc.extract_regex(text, pattern)
+    found = matches.is_valid().to_numpy(zero_copy_only=False)
+    groups = pd.DataFrame({
+        field.name: matches.field(i).to_pandas(types_mapper=None).astype(object)
+        for i, field in enumerate(matches.type)
+    })
+    return groups[found].replace("", np.nan)
 
-    if "description" in df.columns:
-        for idx, row in df.iterrows():
-            desc = str(row.get("description", "")).lower()
-            import re
-            salary_patterns = [
-                r'(\d+)[k€]\s*-\s*(\d+)[k€]',  # 50k€ - 70k€
-                r'€\s*(\d+)[,.]?(\d+)?\s*k?\s*-\s*€?\s*(\d+)[,.]?(\d+)?\s*k?',  # €50k - €70k
-                r'salary:\s*€?(\d+)[,.]?(\d+)?\s*k?',  # salary: 50k
-            ]
-
-            for pattern in salary_patterns:
-                match = re.search(pattern, desc)
-                if match and pd.isna(row.get("min_amount")):
-                    try:
-                        min_sal = float(match.group(1))
-                        max_sal = float(match.group(2)) if len(match.groups()) > 1 else min_sal
-
-                        if 'k' in match.group(0):
-                            min_sal *= 1000
-                            max_sal *= 1000
-
-                        df.at[idx, "min_amount"] = min_sal
-                        df.at[idx, "max_amount"] = max_sal
-                        break
-                    except:
-                        pass
-
-        df = df.drop(columns=["description"], errors="ignore")
-
-    def extract_skills(title):
-        if not title:
-            return []
-        title_lower = title.lower()
-        skills = []
-        if "python" in title_lower:
-            skills.append("Python")
-        if "javascript" in title_lower or "js" in title_lower:
-            skills.append("JavaScript")
-        if "react" in title_lower:
-            skills.append("React")
-        if "java" in title_lower and "javascript" not in title_lower:
-            skills.append("Java")
-        if "angular" in title_lower:
-            skills.append("Angular")
-        if "node" in title_lower:
-            skills.append("Node.js")
-        return skills
-
-    df["skills"] = df["title"].apply(extract_skills)
+def _parse_amounts(values, thousands):
+    values = values.astype(object).str.replace(r"^(\d{1,3}(?:[ .,]\d{3})+)[.,]\d{1,2}$", r"\1", regex=True)
+    grouped = values.str.fullmatch(r"\d{1,3}(?:[ .,]\d{3})+").fillna(False).astype(bool)
+    values = values.where(~grouped, values.str.replace(r"[ .,]", "", regex=True))
+    amounts = pd.to_numeric(values.str.replace(",", ".", regex=False), errors="coerce")
+    return amounts.where(~(thousands & (amounts < 1000)), amounts * 1000)
+
+def extract_salaries(descriptions):
+    """Salaires mentionnés dans les descriptions, motif par motif sur toute la colonne.
+
+    Renvoie un DataFrame aligné sur descriptions avec min_amount, max_amount,
+    currency et interval (NaN quand aucun salaire n'est reconnu). Les motifs
+    sont essayés dans l'ordre de SALARY_PATTERNS ; un montant seul après un
+    mot-clé doit porter une devise, un « k » ou dépasser 1000.
+    """
+    result = pd.DataFrame(index=descriptions.index, columns=SALARY_COLUMNS, dtype=object)
+    if descriptions.empty:
+        return result
+    text = pc.utf8_lower(pa.array(descriptions.astype(object).where(descriptions.notna(), None), type=pa.string()))
+
+    matches = []
+    for pattern in SALARY_PATTERNS:
+        groups = _extract_first(text, pattern)
+        matches.append(groups.reindex(columns=["cur1", "cur2", "cur3", "min", "k1", "max", "k2", "period", "period2"]))
+    matches = pd.concat(matches)
+    if matches.empty:
+        return result
+
+    thousands = matches[["k1", "k2"]].notna().any(axis=1)
+    low = _parse_amounts(matches["min"], thousands)
+    high = _parse_amounts(matches["max"].fillna(matches["min"]), thousands)
+    currency = matches["cur1"].fillna(matches["cur2"]).fillna(matches["cur3"]).str.strip().map(SALARY_CURRENCIES)
+    period = matches["period"].fillna(matches["period2"]).fillna("").astype(object)
+    interval = pd.Series(
+        np.select([period.str.contains(p) for _, p in SALARY_PERIODS], [name for name, _ in SALARY_PERIODS], default=""),
+        index=matches.index,
+    ).replace("", None)
+
+    plausible = currency.notna() | thousands | (low >= 1000)
+    valid = low.notna() & high.notna() & (high >= low) & plausible
+    best = pd.DataFrame({
+        "min_amount": low, "max_amount": high, "currency": currency, "interval": interval,
+    })[valid]
+    best = best[~best.index.duplicated()]
+    positions = best.index.to_numpy()
+    result.iloc[positions, :] = best[SALARY_COLUMNS].to_numpy()
+    return result
+
+def fill_salaries_from_description(df):
+    """Complète les salaires absents de l'offre par ceux trouvés dans le texte de sa description"""
     df["min_amount"] = pd.to_numeric(df["min_amount"], errors="coerce")
-    df["max_amount"] = pd.to_numeric(df["max_amount"], errors="coerce")
-    df["salary_avg"] = (df["min_amount"] + df["max_amount"]) / 2
-    df["date_posted"] = pd.to_datetime(df["date_posted"], errors="coerce")
-    df["scraped_at"] = pd.to_datetime(df["scraped_at"], errors="coerce")
+    missing = df["min_amount"].isna()
+    if not missing.any():
+        return df
+    extracted = extract_salaries(df.loc[missing, "description_text"])
+    found = extracted["min_amount"].notna()
+    rows = found[found].index
+    df.loc[rows, SALARY_COLUMNS] = extracted.loc[rows, SALARY_COLUMNS].to_numpy()
+    return df
 
-    columns_to_remove = [
-        "job_url", "job_url_direct", "company_url_direct", "url", "redirect_url",
-        "company_url", "company_logo", "logo", "logo_url", "company_logo_url",
-        "apply_url", "external_url", "thumbnail", "image", "company_image", "favicon","salary_source", "interval", "min_amount", "max_amount", "currency",
-        "experience_range", "company_rating", "company_reviews_count", "vacancy_count",
-        "work_from_home_type", "company_addresses", "company_num_employees",
-        "company_revenue", "company_description", "listing_type", "emails","job_level","job_function", "salary_avg"
-    ]
-    df = df.drop(columns=[col for col in columns_to_remove if col in df.columns], errors='ignore')
-    df = df[df["skills"].apply(lambda x: isinstance(x, list) and len(x) > 0)]
-
-    logger.info(f"Lignes après nettoyage : {len(df)}")
-    df.to_csv(f"{CLEAN_DATA_DIR}/indeed_jobs_clean.csv", index=False, encoding="utf-8")
-    logger.info(f"Indeed nettoyé: {len(df)} offres")
-
-
-def clean_linkedin_jobs():
-    logger.info("Nettoyage des données LinkedIn")
-    df = pd.DataFrame(list(db["linkedin_jobs"].find()))
-    df.drop(columns=["_id"], inplace=True, errors="ignore")
-    logger.info(f"Lignes initiales : {len(df)}")
-    
-    df = df[df["title"].notna() & (df["title"] != "")]
-    df = df[df["company"].notna() & (df["company"] != "")]
+
+# Colonnes JobSpy sans usage en aval (liens, logos, métadonnées d'entreprise)
+JOBSPY_DROPPED_COLUMNS = [
+    "job_url", "job_url_direct", "company_url_direct", "url", "redirect_url",
+    "company_url", "company_logo", "logo", "logo_url", "company_logo_url",
+    "apply_url", "external_url", "thumbnail", "image", "company_image", "favicon", "salary_source",
+    "experience_range", "company_rating", "company_reviews_count", "vacancy_count",
+    "work_from_home_type", "company_addresses", "company_num_employees",
+    "company_revenue", "company_description", "listing_type", "emails", "job_level", "job_function",
+]
+
+def transform_jobspy(df, seen_ids, rejections):
+    """Nettoie un morceau d'offres JobSpy (Indeed ou LinkedIn, même format).
+
+    seen_ids garde les id des morceaux précédents de la même source.
+    """
     df = df.drop_duplicates(subset=["id"], keep="first")
-    
-    if "description" in df.columns:
-        for idx, row in df.iterrows():
-            desc = str(row.get("description", "")).lower()
-            
-            # Chercher patterns de salaires
-            import re
-            salary_patterns = [
-                r'(\d+)[k€$]\s*-\s*(\d+)[k€$]',  # 50k€ - 70k€
-                r'[€$]\s*(\d+)[,.]?(\d+)?\s*k?\s*-\s*[€$]?\s*(\d+)[,.]?(\d+)?\s*k?',  # €50k - €70k
-                r'salary:\s*[€$]?(\d+)[,.]?(\d+)?\s*k?',  # salary: 50k
-                r'compensation:\s*[€$]?(\d+)[,.]?(\d+)?\s*k?',  # compensation: 50k
-            ]
-            
-            for pattern in salary_patterns:
-                match = re.search(pattern, desc)
-                if match and pd.isna(row.get("min_amount")):
-                    try:
-                        min_sal = float(match.group(1))
-                        max_sal = float(match.group(2)) if len(match.groups()) > 1 else min_sal
-                        
-                        if 'k' in match.group(0):
-                            min_sal *= 1000
-                            max_sal *= 1000
-                            
-                        df.at[idx, "min_amount"] = min_sal
-                        df.at[idx, "max_amount"] = max_sal
-                        break
-                    except:
-                        pass
-        
-        df = df.drop(columns=["description"], errors="ignore")
-    
-    def extract_skills(title):
-        if not title:
-            return []
-        title_lower = title.lower()
-        skills = []
-        if "python" in title_lower:
-            skills.append("Python")
-        if "javascript" in title_lower or "js" in title_lower:
-            skills.append("JavaScript")
-        if "react" in title_lower:
-            skills.append("React")
-        if "java" in title_lower and "javascript" not in title_lower:
-            skills.append("Java")
-        if "angular" in title_lower:
-            skills.append("Angular")
-        if "node" in title_lower:
-            skills.append("Node.js")
-        if "full stack" in title_lower:
-            skills.append("Full Stack")
-        return skills
-    
-    df["skills"] = df["title"].apply(extract_skills)
+    # Un id déjà rencontré dans un morceau précédent est un doublon
+    df = df[~df["id"].isin(seen_ids)]
+    seen_ids.update(df["id"])
+
+    # Descriptions collectées en HTML : seul leur texte est conservé
+    df["description_text"] = html_to_text_column(df["description"])
+    df = df.drop(columns=["description"])
+    df["skills"] = tag_skills(df["title"], df["description_text"])
+    df = fill_salaries_from_description(df)
+
     df["min_amount"] = pd.to_numeric(df["min_amount"], errors="coerce")
     df["max_amount"] = pd.to_numeric(df["max_amount"], errors="coerce")
     df["salary_avg"] = (df["min_amount"] + df["max_amount"]) / 2
     df["date_posted"] = pd.to_datetime(df["date_posted"], errors="coerce")
     df["scraped_at"] = pd.to_datetime(df["scraped_at"], errors="coerce")
 
-    columns_to_remove = [
-        "job_url", "job_url_direct", "company_url_direct", "url", "redirect_url",
-        "company_url", "company_logo", "logo", "logo_url", "company_logo_url",
-        "apply_url", "external_url", "thumbnail", "image", "company_image", "favicon","salary_source", "interval", "min_amount", "max_amount", "currency",
-        "experience_range", "company_rating", "company_reviews_count", "vacancy_count",
-        "work_from_home_type", "company_addresses", "company_num_employees",
-        "company_revenue", "company_description", "listing_type", "emails","job_level","job_function", "salary_avg"
-    ]
-    df = df.drop(columns=[col for col in columns_to_remove if col in df.columns], errors='ignore')
-    df = df[df["skills"].apply(lambda x: isinstance(x, list) and len(x) > 0)]
+    df = df.drop(columns=[col for col in JOBSPY_DROPPED_COLUMNS if col in df.columns])
+    return apply_validity(df, VALIDITY_RULES["jobspy"], rejections)
+
+def clean_jobspy_jobs(source, label, full_rebuild=False):
+    """Nettoie la collection <source>_jobs vers <source>_jobs_clean"""
+    logger.info(f"Nettoyage des données {label}")
+    seen_ids = set()
+    rejections = Counter()
 
-    logger.info(f"Lignes après nettoyage : {len(df)}")
-    df.to_csv(f"{CLEAN_DATA_DIR}/linkedin_jobs_clean.csv", index=False, encoding="utf-8")
-    logger.info(f"LinkedIn nettoyé: {len(df)} offres")
+    def transform(df):
+        return transform_jobspy(df, seen_ids, rejections)
 
-def create_dimension_tables():
+    read, written = clean_in_chunks(f"{source}_jobs", f"{source}_jobs_clean", transform, full_rebuild)
+    logger.info(f"Lignes initiales : {read}")
+    log_rejections(label, rejections)
+    logger.info(f"{label} nettoyé: {written} offres")
+
+def clean_indeed_jobs(full_rebuild=False):
+    clean_jobspy_jobs("indeed", "Indeed", full_rebuild)
+
+def clean_linkedin_jobs(full_rebuild=False):
+    clean_jobspy_jobs("linkedin", "LinkedIn", full_rebuild)
+
+def create_dimension_tables(full_rebuild=False):
+    # Les dimensions sont toujours régénérées
     logger.info("Création des tables de dimensions")
 
     countries_data = [
@@ -360,15 +970,7 @@ def create_dimension_tables():
     pd.DataFrame(countries_data).to_csv(f"{CLEAN_DATA_DIR}/dim_countries.csv", index=False)
 
     skills_data = [
-        {"skill_group": "Programming Language", "tech_label": "Python"},
-        {"skill_group": "Programming Language", "tech_label": "JavaScript"},
-        {"skill_group": "Programming Language", "tech_label": "Java"},
-        {"skill_group": "Framework", "tech_label": "React"},
-        {"skill_group": "Runtime", "tech_label": "Node.js"},
-        {"skill_group": "Programming Language", "tech_label": "Go"},
-        {"skill_group": "Programming Language", "tech_label": "Rust"},
-        {"skill_group": "Programming Language", "tech_label": "TypeScript"},
-        {"skill_group": "Field", "tech_label": "Data Science"},
+        {"skill_group": skill["skill_group"], "tech_label": skill["tech_label"]} for skill in SKILLS_DIMENSION
     ]
     pd.DataFrame(skills_data).to_csv(f"{CLEAN_DATA_DIR}/dim_skills.csv", index=False)
 
@@ -384,40 +986,301 @@ def create_dimension_tables():
 
     logger.info("Tables de dimensions créées")
 
-def clean_html_simple(text):
-    """Nettoie le HTML très simplement"""
-    if pd.isna(text) or text == "":
-        return ""
+# Sorties nettoyées des offres d'emploi, par source (libellés de dim_sources)
+JOB_OFFER_OUTPUTS = {
+    "Adzuna": "adzuna_jobs_clean",
+    "Indeed": "indeed_jobs_clean",
+    "LinkedIn": "linkedin_jobs_clean",
+}
+CANONICAL_OUTPUT = "job_offers_canonical"
+
+# MinHash : 64 permutations découpées en 16 bandes de 4 lignes ; deux annonces
+# partagent un seau LSH dès ~50 % de similarité, la paire est ensuite vérifiée
+# contre DEDUP_THRESHOLD sur la signature complète
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+MINHASH_EMPTY = np.uint64(2**32 - 1)
+DEDUP_KEY_WIDTH = 96
+DEDUP_BLOCK_SIZE = 20000
+
+_TITLE_NOISE = r"\(?\b(?:h/f|f/h|m/f|f/m|m/w/d|w/m/d|m/f/d|f/m/d|h/f/x|x/h/f)\b\)?"
+_COMPANY_SUFFIXES = r"\b(?:sas|sasu|sarl|sa|gmbh|ag|ltd|limited|inc|llc|bv|nv|spa|srl|plc|group|groupe)\b"
+
+def read_output(output, columns):
+    """Colonnes d'une sortie nettoyée (seules ces colonnes sont lues en Parquet)"""
+    if CLEAN_FORMAT == "csv":
+        path = f"{CLEAN_DATA_DIR}/{output}.csv"
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=columns)
+        return pd.read_csv(path, usecols=columns, dtype=str, keep_default_na=False)
+    files = parquet_files(output)
+    if not files:
+        return pd.DataFrame(columns=columns)
+    return pd.concat([pq.read_table(path, columns=columns).to_pandas() for path in files], ignore_index=True)
+
+def _normalize_text(col):
+    col = col.astype(object).where(col.notna(), "").astype(str)
+    col = col.str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii").str.lower()
+    return col
+
+def normalize_offer_keys(title, company, location):
+    """Clé de comparaison d'une annonce : titre sans mention de genre, entreprise
+    sans forme juridique, ville (avant la première virgule), sans accents ni ponctuation.
+
+    Renvoie (clés, premier mot de la ville).
+    """
+    title = _normalize_text(title).str.replace(_TITLE_NOISE, " ", regex=True)
+    company = _normalize_text(company).str.replace(_COMPANY_SUFFIXES, " ", regex=True)
+    city = _normalize_text(location).str.split(",").str[0].str.replace(r"[^a-z0-9]+", " ", regex=True).str.strip()
+    key = (title + " " + company).str.replace(r"[^a-z0-9]+", " ", regex=True).str.strip() + " " + city
+    return key.str.strip(), city.str.split(" ").str[0].fillna("")
+
+def minhash_signatures(keys, permutations=MINHASH_PERMUTATIONS, seed=42):
+    """Signatures MinHash des 3-grammes de caractères de chaque clé.
+
+    Les clés (ASCII, tronquées à DEDUP_KEY_WIDTH) sont vues comme une matrice
+    d'octets ; les 3-grammes et les hachages multiply-shift
+    h(x) = (a·x + b) >> 32 sont calculés en numpy, par blocs de
+    DEDUP_BLOCK_SIZE lignes.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2**63, size=permutations, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2**63, size=permutations, dtype=np.uint64)
+    raw = np.array(keys.str.slice(0, DEDUP_KEY_WIDTH).str.encode("ascii").tolist(), dtype=f"S{DEDUP_KEY_WIDTH}")
+    chars = raw.view(np.uint8).reshape(len(keys), DEDUP_KEY_WIDTH)
+
+    signatures = np.empty((len(keys), permutations), dtype=np.uint32)
+    for start in range(0, len(keys), DEDUP_BLOCK_SIZE):
+        block = chars[start:start + DEDUP_BLOCK_SIZE].astype(np.uint64)
+        shingles = (block[:, :-2] << np.uint64(16)) | (block[:, 1:-1] << np.uint64(8)) | block[:, 2:]
+        padding = block[:, 2:] == 0
+        hashed = np.empty_like(shingles)
+        for k in range(permutations):
+            np.multiply(shingles, a[k], out=hashed)
+            hashed += b[k]
+            hashed >>= np.uint64(32)
+            hashed[padding] = MINHASH_EMPTY
+            signatures[start:start + DEDUP_BLOCK_SIZE, k] = hashed.min(axis=1)
+    return signatures
+
+def lsh_candidate_pairs(signatures, bands=LSH_BANDS):
+    """Paires candidates : annonces qui partagent au moins un seau (une bande de signature).
+
+    Dans chaque seau, chaque annonce est reliée à la précédente et à la
+    première du seau : pas de comparaison deux à deux, même pour un gros seau.
+    """
+    n = len(signatures)
+    rows = signatures.shape[1] // bands
+    mix = np.random.default_rng(0).integers(1, 2**63, size=rows, dtype=np.uint64) | np.uint64(1)
+    positions = np.arange(n)
+    codes = []
+    for band in range(bands):
+        keys = (signatures[:, band * rows:(band + 1) * rows].astype(np.uint64) * mix).sum(axis=1)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        same = sorted_keys[1:] == sorted_keys[:-1]
+        head = order[np.maximum.accumulate(np.where(np.r_[True, ~same], positions, 0))]
+        left = np.concatenate([order[:-1][same], head[1:][same]])
+        right = np.concatenate([order[1:][same], order[1:][same]])
+        # Paire (i, j), i < j, codée i·n + j
+        codes.append(np.minimum(left, right) * n + np.maximum(left, right))
+    codes = np.concatenate(codes) if codes else np.empty(0, dtype=np.int64)
+    pairs = np.unique(codes[codes // n != codes % n])
+    return pairs // n, pairs % n
+
+def signature_similarity(signatures, left, right, chunk_size=100_000):
+    """Similarité de Jaccard estimée de chaque paire (part des permutations dont le minimum coïncide)"""
+    similarity = np.empty(len(left), dtype=np.float32)
+    for start in range(0, len(left), chunk_size):
+        end = start + chunk_size
+        similarity[start:end] = (signatures[left[start:end]] == signatures[right[start:end]]).mean(axis=1)
+    return similarity
+
+def source_components(left, right, similarity, sources):
+    """Composante de chaque annonce (plus petit indice de la composante), sans
+    jamais réunir deux annonces d'une même source.
+
+    Les paires confirmées sont fusionnées par similarité décroissante
+    (union-find) ; une paire qui mettrait deux annonces d'une même source dans
+    une composante est écartée. Dans une chaîne A–X–B où A et B viennent de la
+    même source, X ne rejoint que la plus proche des deux.
+    """
+    codes, _ = pd.factorize(pd.Series(sources, dtype=object))
+    masks = [1 << int(code) for code in codes]
+    parent = list(range(len(sources)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    order = np.lexsort((right, left, -similarity))
+    for i, j in zip(left[order].tolist(), right[order].tolist()):
+        root_i, root_j = find(i), find(j)
+        if root_i == root_j or masks[root_i] & masks[root_j]:
+            continue
+        root_i, root_j = min(root_i, root_j), max(root_i, root_j)
+        parent[root_j] = root_i
+        masks[root_i] |= masks[root_j]
+
+    labels = np.arange(len(sources))
+    touched = np.unique(np.concatenate([left, right]))
+    labels[touched] = [find(i) for i in touched.tolist()]
+    return labels
+
+def deduplicate_job_offers(full_rebuild=False):
+    """Identifiant d'offre canonique des annonces Adzuna, Indeed et LinkedIn.
+
+    Les annonces d'une même offre (titre, entreprise ou lieu légèrement
+    différents d'une source à l'autre) sont regroupées par MinHash / LSH :
+    les paires candidates viennent des seaux, pas d'une comparaison O(n²).
+    Recalculé à chaque nettoyage sur les seules colonnes utiles.
+    """
+    logger.info("Déduplication des offres entre sources")
+    columns = [DOC_ID, "title", "company", "location"]
+    offers = pd.concat(
+        [read_output(output, columns).assign(source=source) for source, output in JOB_OFFER_OUTPUTS.items()],
+        ignore_index=True,
+    )
+    # Ordre stable : le représentant d'un groupe (plus petit doc_id) ne dépend pas de l'ordre de lecture
+    offers[DOC_ID] = offers[DOC_ID].astype(str)
+    offers = offers.sort_values([DOC_ID, "source"], ignore_index=True)
+
+    keys, cities = normalize_offer_keys(offers["title"], offers["company"], offers["location"])
+    comparable = (keys.str.len() >= 3).to_numpy()
+    labels = np.arange(len(offers))
+    if comparable.any():
+        rows = np.flatnonzero(comparable)
+        signatures = minhash_signatures(keys[comparable])
+        left, right = lsh_candidate_pairs(signatures)
+        # Le titre et l'entreprise pèsent l'essentiel des 3-grammes : la même
+        # offre dans deux villes différentes reste deux offres. Au sein d'une
+        # source, deux annonces proches (« Python Developer » / « Senior Python
+        # Developer ») sont deux offres distinctes.
+        cities = cities.to_numpy(dtype=object)[rows]
+        sources = offers["source"].to_numpy(dtype=object)[rows]
+        similarity = signature_similarity(signatures, left, right)
+        similar = (
+            (similarity >= DEDUP_THRESHOLD)
+            & ((cities[left] == cities[right]) | (cities[left] == "") | (cities[right] == ""))
+            & (sources[left] != sources[right])
+        )
+        left, right = left[similar], right[similar]
+        # Une offre canonique compte au plus une annonce par source, même par transitivité
+        labels[rows] = rows[source_components(left, right, similarity[similar], sources)]
+        logger.info(f"{len(left)} paires d'annonces similaires confirmées")
+
+    offers["canonical_offer_id"] = offers[DOC_ID].to_numpy()[labels]
+    groups = offers.groupby("canonical_offer_id")["source"].agg(["size", "nunique"])
+    logger.info(
+        f"{len(offers)} annonces, {len(groups)} offres canoniques, "
+        f"dont {int((groups['nunique'] > 1).sum())} publiées sur plusieurs sources"
+    )
+
+    if CLEAN_FORMAT != "csv":
+        shutil.rmtree(f"{CLEAN_DATA_DIR}/{CANONICAL_OUTPUT}", ignore_errors=True)
+    write_output(offers[["source", DOC_ID, "canonical_offer_id"]], CANONICAL_OUTPUT, 0, datetime.now().strftime("%Y%m%dT%H%M%S%f"))
+
+# Tâches du nettoyage : fonction et tâches dont elle dépend. Les offres sont
+# étiquetées avec SKILLS_DIMENSION (la source de dim_skills.csv, pas le
+# fichier) et ne dépendent donc pas de « dimensions » ; elles sont rapprochées
+# d'une source à l'autre une fois toutes nettoyées.
+CLEANING_TASKS = {
+    "dimensions": (create_dimension_tables, []),
+    "adzuna_jobs": (clean_adzuna_jobs, []),
+    "github_trends": (clean_github_trends, []),
+    "google_trends": (clean_google_trends, []),
+    "stackoverflow_survey": (clean_stackoverflow_survey, []),
+    "indeed_jobs": (clean_indeed_jobs, []),
+    "linkedin_jobs": (clean_linkedin_jobs, []),
+    "job_offers_dedup": (deduplicate_job_offers, ["adzuna_jobs", "indeed_jobs", "linkedin_jobs"]),
+}
+
+def run_task(name, full_rebuild=False):
+    """Exécute une tâche (dans un processus du pool) et renvoie sa durée"""
+    start = time.perf_counter()
     try:
-        # Retirer toutes les balises HTML
-        soup = BeautifulSoup(str(text), 'html.parser')
-        clean_text = soup.get_text()
-        # Nettoyer les espaces
-        clean_text = re.sub(r'\s+', ' ', clean_text).strip()
-        return clean_text
-    except:
-        return ""
+        CLEANING_TASKS[name][0](full_rebuild=full_rebuild)
+    finally:
+        shutdown_html_pool()
+    return time.perf_counter() - start
+
+def run_cleaning(tasks, workers=CLEAN_WORKERS, full_rebuild=False):
+    """Ordonnance les tâches sur un pool de processus, dès que leurs dépendances sont terminées.
+
+    Renvoie la durée de chaque tâche. La première tâche en échec annule
+    celles qui n'ont pas démarré et lève aussitôt une RuntimeError qui la
+    nomme. Les tâches déjà en cours ne sont pas interrompues : l'interpréteur
+    attend la fin de leurs processus avant de se terminer.
+    """
+    for name, (_, deps) in tasks.items():
+        unknown = [dep for dep in deps if dep not in tasks]
+        if unknown:
+            raise RuntimeError(f"Tâche '{name}' : dépendances inconnues {unknown}")
+
+    pending = {name: set(deps) for name, (_, deps) in tasks.items()}
+    done, timings = set(), {}
+    executor = ProcessPoolExecutor(max_workers=max(1, workers), initializer=init_worker)
+    running = {}
+    failed = True
+    try:
+        while pending or running:
+            for name in [name for name, deps in pending.items() if deps <= done]:
+                running[executor.submit(run_task, name, full_rebuild)] = name
+                del pending[name]
+            if not running:
+                raise RuntimeError(f"Dépendances circulaires entre {sorted(pending)}")
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    timings[name] = future.result()
+                except Exception as e:
+                    raise RuntimeError(f"Tâche de nettoyage '{name}' en échec : {e}") from e
+                logger.info(f"Tâche {name} terminée en {timings[name]:.1f}s")
+                done.add(name)
+        failed = False
+    finally:
+        executor.shutdown(wait=not failed, cancel_futures=True)
+    return timings
 
 def main():
+    parser = argparse.ArgumentParser(description="Nettoyage des collections MongoDB vers datasets_clean")
+    parser.add_argument("--workers", type=int, default=CLEAN_WORKERS, help="processus de nettoyage parallèles")
+    parser.add_argument(
+        "--full-rebuild", action="store_true",
+        help="ignore les watermarks : relit toutes les collections et réécrit les sorties",
+    )
+    args = parser.parse_args()
+
     start = datetime.now()
-    logger.info("Démarrage du nettoyage TalentInsight")
+    logger.info("Démarrage du nettoyage TalentInsight" + (" (reconstruction complète)" if args.full_rebuild else ""))
+    if CLEAN_FORMAT not in ("parquet", "csv"):
+        logger.error(f"CLEAN_FORMAT inconnu : {CLEAN_FORMAT} (parquet ou csv)")
+        exit(1)
+    if not check_connection():
+        exit(1)
 
-    clean_adzuna_jobs()
-    clean_github_trends()
-    clean_google_trends()
-    clean_stackoverflow_survey()
-    clean_indeed_jobs()
-    clean_linkedin_jobs()
-    create_dimension_tables()
+    try:
+        timings = run_cleaning(CLEANING_TASKS, args.workers, args.full_rebuild)
+    except RuntimeError as e:
+        logger.error(str(e))
+        exit(1)
 
     duration = datetime.now() - start
-    logger.info(f"Nettoyage terminé en {duration.total_seconds():.1f}s")
+    logger.info(f"Nettoyage terminé en {duration.total_seconds():.1f}s (somme des tâches : {sum(timings.values()):.1f}s)")
 
-    for file in os.listdir(CLEAN_DATA_DIR):
+    for file in sorted(os.listdir(CLEAN_DATA_DIR)):
         if file.endswith(".csv"):
             size = os.path.getsize(os.path.join(CLEAN_DATA_DIR, file))
             logger.info(f"Fichier nettoyé: {file} ({size} bytes)")
+        elif not file.startswith(".") and os.path.isdir(os.path.join(CLEAN_DATA_DIR, file)):
+            files = parquet_files(file)
+            size = sum(os.path.getsize(path) for path in files)
+            logger.info(f"Jeu Parquet nettoyé: {file} ({len(files)} fichiers, {size} bytes)")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
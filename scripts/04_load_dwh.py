@@ -4,18 +4,116 @@
 """
 
 import os
+import re
+import ast
+import glob
 import sqlite3
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 from datetime import datetime
 from loguru import logger
 
 CLEAN_DATA_DIR = "datasets_clean"
+# Format de la zone nettoyée : parquet ou csv (celui de 03_clean_mongodb.py) est
+# lu strictement ; auto choisit pour chaque sortie le format présent, le plus
+# récemment écrit si les deux le sont (CSV d'exemple du dépôt, Parquet du nettoyage)
+CLEAN_FORMAT = os.getenv("CLEAN_FORMAT", "auto")
 DWH_DIR = "dwh"
 os.makedirs(DWH_DIR, exist_ok=True)
 
 logger.remove()
 logger.add(f"{DWH_DIR}/dwh.log", level="INFO", rotation="1 day")
 
+# Colonnes listes : natives en Parquet, représentation Python dans les CSV
+LIST_COLUMNS = ["skills", "languages_list"]
+
+# Colonnes de f_job_offers
+JOB_OFFER_COLUMNS = [
+    "id_country", "id_skill", "id_source", "id_company", "date_key", "title", "location",
+    "salary_min", "salary_max", "salary_avg", "canonical_offer_id",
+]
+
+# Une sortie nettoyée par édition du survey
+SURVEY_OUTPUT = re.compile(r"stackoverflow_survey_(\d{4})_clean")
+
+
+def parse_list(value):
+    """Liste d'une cellule : tableau Parquet ou représentation Python d'un CSV (\"['Python']\")"""
+    if isinstance(value, str):
+        return ast.literal_eval(value)
+    if value is None or (not hasattr(value, "__len__") and pd.isna(value)):
+        return []
+    return [str(item) for item in value]
+
+
+def parquet_files(name):
+    return sorted(glob.glob(f"{CLEAN_DATA_DIR}/{name}/**/*.parquet", recursive=True))
+
+
+def clean_format(name):
+    """Format à lire pour une sortie : CLEAN_FORMAT s'il est imposé, sinon le
+    format présent sur disque, le plus récent si les deux le sont"""
+    if CLEAN_FORMAT != "auto":
+        return CLEAN_FORMAT
+    csv_path = f"{CLEAN_DATA_DIR}/{name}.csv"
+    files = parquet_files(name)
+    if not files and not os.path.exists(csv_path):
+        raise FileNotFoundError(
+            f"Sortie nettoyée absente : ni {CLEAN_DATA_DIR}/{name}/ ni {csv_path} (CLEAN_FORMAT=auto)"
+        )
+    if files and os.path.exists(csv_path):
+        newest = max(os.path.getmtime(path) for path in files)
+        fmt = "parquet" if newest >= os.path.getmtime(csv_path) else "csv"
+    else:
+        fmt = "parquet" if files else "csv"
+    logger.info(f"{name} : lu au format {fmt} (CLEAN_FORMAT=auto)")
+    return fmt
+
+
+def read_clean(name):
+    """Lit une sortie nettoyée : jeu Parquet typé datasets_clean/<name>/ ou
+    fichier datasets_clean/<name>.csv, selon clean_format.
+
+    Avec un CLEAN_FORMAT imposé, une sortie absente lève FileNotFoundError, sans
+    repli sur l'autre format dont les fichiers peuvent dater d'un nettoyage antérieur.
+    """
+    if clean_format(name) == "csv":
+        path = f"{CLEAN_DATA_DIR}/{name}.csv"
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Sortie nettoyée absente : {path} (CLEAN_FORMAT=csv)")
+        df = pd.read_csv(path, dtype={"doc_id": str, "canonical_offer_id": str})
+        for col in LIST_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].map(parse_list)
+        return df
+
+    directory = f"{CLEAN_DATA_DIR}/{name}"
+    files = parquet_files(name)
+    if not files:
+        raise FileNotFoundError(
+            f"Jeu Parquet absent : {directory}/ (CLEAN_FORMAT=parquet ; CLEAN_FORMAT=csv ou auto pour charger les CSV)"
+        )
+    try:
+        schema = pa.unify_schemas([pq.read_schema(path) for path in files])
+    except pa.ArrowInvalid as e:
+        raise RuntimeError(
+            f"{directory}/ : fichiers de schémas incompatibles ({e}), relancer 03_clean_mongodb.py --full-rebuild"
+        ) from e
+    return ds.dataset(files, schema=schema, format="parquet").to_table().to_pandas()
+
+
+def survey_outputs():
+    """Sorties nettoyées des éditions du survey : {année: nom}"""
+    suffixes = {"csv": [".csv"], "parquet": [""]}.get(CLEAN_FORMAT, [".csv", ""])
+    names = sorted({
+        os.path.basename(path).removesuffix(suffix)
+        for suffix in suffixes
+        for path in glob.glob(f"{CLEAN_DATA_DIR}/stackoverflow_survey_*_clean{suffix}")
+    })
+    return {int(match.group(1)): name for name in names if (match := SURVEY_OUTPUT.fullmatch(name))}
+
 
 def create_dwh_schema(conn):
     """Crée le schéma du Data Warehouse"""
@@ -95,6 +193,7 @@ def create_dwh_schema(conn):
         salary_min REAL,
         salary_max REAL,
         salary_avg REAL,
+        canonical_offer_id TEXT,
         FOREIGN KEY (id_country) REFERENCES d_country(id_country),
         FOREIGN KEY (id_skill) REFERENCES d_skill(id_skill),
         FOREIGN KEY (id_source) REFERENCES d_source(id_source),
@@ -146,6 +245,7 @@ def create_dwh_schema(conn):
         id_response INTEGER PRIMARY KEY AUTOINCREMENT,
         id_country INTEGER,
         id_source INTEGER,
+        survey_year INTEGER,
         salary REAL,
         years_experience TEXT,
         dev_type TEXT,
@@ -232,12 +332,21 @@ def load_job_offers(conn):
         .to_dict()
     )
 
+    # Offre canonique de chaque annonce : une même offre publiée sur plusieurs
+    # sources partage son identifiant
+    try:
+        canonical = read_clean("job_offers_canonical")
+        canonical_ids = dict(zip(zip(canonical["source"], canonical["doc_id"]), canonical["canonical_offer_id"]))
+    except (FileNotFoundError, KeyError) as e:
+        logger.warning(f"Pas de déduplication des offres ({e})")
+        canonical_ids = {}
+
     job_data = []
 
     # 1. ADZUNA
     logger.info("Chargement Adzuna...")
     try:
-        df_adzuna = pd.read_csv(f"{CLEAN_DATA_DIR}/adzuna_jobs_clean.csv")
+        df_adzuna = read_clean("adzuna_jobs_clean")
         for _, row in df_adzuna.iterrows():
             created_date = pd.to_datetime(row["created"], errors="coerce")
             date_key = created_date.strftime("%Y-%m-%d") if pd.notna(created_date) else "2024-06-30"
@@ -246,7 +355,7 @@ def load_job_offers(conn):
             id_country = country_map.get(country_code, 1)
             id_source = source_map.get("Adzuna", 1)
 
-            skills = eval(row["skills"]) if pd.notna(row["skills"]) and str(row["skills"]) != "[]" else ["Unknown"]
+            skills = parse_list(row["skills"]) or ["Unknown"]
             for skill in skills:
                 skill_id = conn.execute("SELECT id_skill FROM d_skill WHERE tech_label = ?", (skill,)).fetchone()
                 id_skill = skill_id[0] if skill_id else 1
@@ -256,21 +365,24 @@ def load_job_offers(conn):
                     "date_key": date_key, "title": row["title"], "location": row["location"],
                     "salary_min": row["salary_min"] if pd.notna(row["salary_min"]) else None,
                     "salary_max": row["salary_max"] if pd.notna(row["salary_max"]) else None,
-                    "salary_avg": row["salary_avg"] if pd.notna(row["salary_avg"]) else None,
+                    "salary_avg": row.get("salary_avg") if pd.notna(row.get("salary_avg")) else None,
+                    "canonical_offer_id": canonical_ids.get(("Adzuna", row.get("doc_id"))),
                 })
+    except (FileNotFoundError, RuntimeError):
+        raise
     except Exception as e:
         logger.error(f"Erreur Adzuna: {e}")
 
     # 2. INDEED
     logger.info("Chargement Indeed...")
     try:
-        df_indeed = pd.read_csv(f"{CLEAN_DATA_DIR}/indeed_jobs_clean.csv")
+        df_indeed = read_clean("indeed_jobs_clean")
         for _, row in df_indeed.iterrows():
             date_posted = pd.to_datetime(row["date_posted"], errors="coerce")
             date_key = date_posted.strftime("%Y-%m-%d") if pd.notna(date_posted) else "2024-06-30"
             
             id_source = source_map.get("Indeed", 5)
-            skills = eval(row["skills"]) if pd.notna(row["skills"]) and str(row["skills"]) != "[]" else ["Unknown"]
+            skills = parse_list(row["skills"]) or ["Unknown"]
             
             for skill in skills:
                 skill_id = conn.execute("SELECT id_skill FROM d_skill WHERE tech_label = ?", (skill,)).fetchone()
@@ -279,23 +391,26 @@ def load_job_offers(conn):
                 job_data.append({
                     "id_country": 1, "id_skill": id_skill, "id_source": id_source, "id_company": 1,
                     "date_key": date_key, "title": row["title"], "location": row["location"],
-                    "salary_min": row["min_amount"] if pd.notna(row["min_amount"]) else None,
-                    "salary_max": row["max_amount"] if pd.notna(row["max_amount"]) else None,
-                    "salary_avg": row["salary_avg"] if pd.notna(row["salary_avg"]) else None,
+                    "salary_min": row.get("min_amount") if pd.notna(row.get("min_amount")) else None,
+                    "salary_max": row.get("max_amount") if pd.notna(row.get("max_amount")) else None,
+                    "salary_avg": row.get("salary_avg") if pd.notna(row.get("salary_avg")) else None,
+                    "canonical_offer_id": canonical_ids.get(("Indeed", row.get("doc_id"))),
                 })
+    except (FileNotFoundError, RuntimeError):
+        raise
     except Exception as e:
         logger.error(f"Erreur Indeed: {e}")
 
     # 3. LINKEDIN
     logger.info("Chargement LinkedIn...")
     try:
-        df_linkedin = pd.read_csv(f"{CLEAN_DATA_DIR}/linkedin_jobs_clean.csv")
+        df_linkedin = read_clean("linkedin_jobs_clean")
         for _, row in df_linkedin.iterrows():
             date_posted = pd.to_datetime(row["date_posted"], errors="coerce")
             date_key = date_posted.strftime("%Y-%m-%d") if pd.notna(date_posted) else "2024-06-30"
             
             id_source = source_map.get("LinkedIn", 6)
-            skills = eval(row["skills"]) if pd.notna(row["skills"]) and str(row["skills"]) != "[]" else ["Unknown"]
+            skills = parse_list(row["skills"]) or ["Unknown"]
             
             for skill in skills:
                 skill_id = conn.execute("SELECT id_skill FROM d_skill WHERE tech_label = ?", (skill,)).fetchone()
@@ -304,14 +419,18 @@ def load_job_offers(conn):
                 job_data.append({
                     "id_country": 1, "id_skill": id_skill, "id_source": id_source, "id_company": 1,
                     "date_key": date_key, "title": row["title"], "location": row["location"],
-                    "salary_min": row["min_amount"] if pd.notna(row["min_amount"]) else None,
-                    "salary_max": row["max_amount"] if pd.notna(row["max_amount"]) else None,
-                    "salary_avg": row["salary_avg"] if pd.notna(row["salary_avg"]) else None,
+                    "salary_min": row.get("min_amount") if pd.notna(row.get("min_amount")) else None,
+                    "salary_max": row.get("max_amount") if pd.notna(row.get("max_amount")) else None,
+                    "salary_avg": row.get("salary_avg") if pd.notna(row.get("salary_avg")) else None,
+                    "canonical_offer_id": canonical_ids.get(("LinkedIn", row.get("doc_id"))),
                 })
+    except (FileNotFoundError, RuntimeError):
+        raise
     except Exception as e:
         logger.error(f"Erreur LinkedIn: {e}")
 
-    jobs_df = pd.DataFrame(job_data)
+    # Colonnes explicites : la table est créée même si aucune offre n'a été chargée
+    jobs_df = pd.DataFrame(job_data, columns=JOB_OFFER_COLUMNS)
     jobs_df.to_sql("f_job_offers", conn, if_exists="replace", index=False)
     logger.info(f"Offres d'emploi chargées: {len(jobs_df)} (Adzuna + Indeed + LinkedIn)")
 
@@ -320,7 +439,7 @@ def load_github_trends(conn):
     """Charge les tendances GitHub"""
     logger.info("Chargement des tendances GitHub")
 
-    df = pd.read_csv(f"{CLEAN_DATA_DIR}/github_trends_clean.csv")
+    df = read_clean("github_trends_clean")
     source_map = (
         pd.read_sql("SELECT source_name, id_source FROM d_source", conn)
         .set_index("source_name")["id_source"]
@@ -363,7 +482,9 @@ def load_google_trends(conn):
     """Charge les tendances de recherche"""
     logger.info("Chargement des tendances Google")
 
-    df = pd.read_csv(f"{CLEAN_DATA_DIR}/google_trends_clean.csv")
+    df = read_clean("google_trends_clean")
+    # Horodatage natif en Parquet, texte en CSV : même clé de date dans les deux cas
+    df["date"] = pd.to_datetime(df["date"], errors="coerce").dt.strftime("%Y-%m-%d")
     source_map = (
         pd.read_sql("SELECT source_name, id_source FROM d_source", conn)
         .set_index("source_name")["id_source"]
@@ -396,7 +517,17 @@ def load_stackoverflow_survey(conn):
     """Charge l'enquête Stack Overflow"""
     logger.info("Chargement enquête Stack Overflow")
 
-    df = pd.read_csv(f"{CLEAN_DATA_DIR}/stackoverflow_survey_clean.csv")
+    frames = []
+    for year, name in survey_outputs().items():
+        frame = read_clean(name)
+        if "SurveyYear" not in frame.columns:
+            frame["SurveyYear"] = year
+        frames.append(frame)
+    if not frames:
+        # Survey absent du lac (collecte en échec) : le reste du DWH est chargé quand même
+        logger.warning(f"Aucune édition du Stack Overflow Survey nettoyée (CLEAN_FORMAT={CLEAN_FORMAT}), table ignorée")
+        return
+    df = pd.concat(frames, ignore_index=True)
     country_map = {"Germany": 1, "France": 2, "Netherlands": 3, "Spain": 4, "Italy": 5, "Poland": 6, "Belgium":7, "Austria": 8, "Switzerland":9}
     source_map = (
         pd.read_sql("SELECT source_name, id_source FROM d_source", conn)
@@ -413,6 +544,7 @@ def load_stackoverflow_survey(conn):
             {
                 "id_country": id_country,
                 "id_source": id_source,
+                "survey_year": row.get("SurveyYear"),
                 "salary": row.get("CompTotal"),
                 "years_experience": row.get("YearsCodePro"),
                 "dev_type": row.get("DevType"),
@@ -433,6 +565,7 @@ def create_indexes(conn):
         "CREATE INDEX IF NOT EXISTS idx_job_country ON f_job_offers(id_country)",
         "CREATE INDEX IF NOT EXISTS idx_job_skill ON f_job_offers(id_skill)",
         "CREATE INDEX IF NOT EXISTS idx_job_date ON f_job_offers(date_key)",
+        "CREATE INDEX IF NOT EXISTS idx_job_canonical ON f_job_offers(canonical_offer_id)",
         "CREATE INDEX IF NOT EXISTS idx_github_skill ON f_github_trends(id_skill)",
         "CREATE INDEX IF NOT EXISTS idx_trends_skill ON f_search_trends(id_skill)",
         "CREATE INDEX IF NOT EXISTS idx_survey_country ON f_survey_responses(id_country)",
@@ -461,7 +594,10 @@ def main():
         load_google_trends(conn)
         load_stackoverflow_survey(conn)
         create_indexes(conn)
-
+    except (FileNotFoundError, RuntimeError) as e:
+        logger.error(f"Chargement interrompu : {e}")
+        raise
+    else:
         # Statistiques finales
         tables = [
             "d_country",
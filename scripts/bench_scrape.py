@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+bench_scrape.py - Benchmark hors ligne des collecteurs de 01_scrape.py
+
+Un serveur HTTP local rejoue les payloads enregistrés dans raw/ (Adzuna,
+GitHub, Google Trends) avec une latence, un taux de 429 et une pagination
+configurables. Chaque collecteur tourne dans un processus séparé, sur un
+dossier raw/ temporaire, et le benchmark mesure requêtes/s, enregistrements/s,
+durée et pic de mémoire (RSS).
+
+Usage: python scripts/bench_scrape.py [--latency 0.05] [--error-rate 0.05] ...
+"""
+
+import os
+import sys
+import json
+import glob
+import gzip
+import time
+import random
+import zlib
+import argparse
+import resource
+import tempfile
+import threading
+import importlib.util
+import multiprocessing
+from queue import Empty
+from datetime import datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RAW_DIR = os.path.join(SCRIPT_DIR, "..", "raw")
+
+COLLECTORS = {
+    "adzuna": ("scrape_adzuna_api", "adzuna_jobs"),
+    "github": ("scrape_github_trends", "github_trends"),
+    "google_trends": ("scrape_google_trends", "google_trends"),
+}
+
+
+def load_recorded(raw_dir, name):
+    """Charge un payload enregistré (raw/<name>.json)"""
+    try:
+        with open(os.path.join(raw_dir, f"{name}.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+class StubState:
+    """Payloads rejoués, paramètres d'injection et compteurs de requêtes"""
+
+    def __init__(self, raw_dir, args):
+        self.adzuna = load_recorded(raw_dir, "adzuna_jobs") or [{"title": "Developer"}]
+        self.github = load_recorded(raw_dir, "github_trends") or [{"full_name": "stub/repo"}]
+        self.trends = {
+            item["keyword"]: item["interest_over_time"]
+            for item in load_recorded(raw_dir, "google_trends")
+        }
+        self.latency = args.latency
+        self.error_rate = args.error_rate
+        self.adzuna_total = args.adzuna_total
+        self.github_per_day = args.github_per_day
+        self.requests = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def reset(self):
+        with self.lock:
+            self.requests = 0
+            self.rejected = 0
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Imite les endpoints Adzuna, GitHub search et Google Trends utilisés par 01_scrape.py"""
+
+    protocol_version = "HTTP/1.1"
+    state = None
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch()
+
+    def do_POST(self):
+        self._dispatch()
+
+    def _dispatch(self):
+        state = self.state
+        with state.lock:
+            state.requests += 1
+            rejected = random.random() < state.error_rate
+            state.rejected += rejected
+        if state.latency:
+            time.sleep(state.latency)
+
+        if rejected:
+            self._send(429, b"{}", headers={"Retry-After": "1"})
+            return
+
+        url = urlsplit(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if "/search/repositories" in url.path:
+            self._github(params)
+        elif "/api/jobs/" in url.path:
+            self._adzuna(url.path, params)
+        elif url.path.endswith("/api/explore"):
+            self._trends_explore(params)
+        elif url.path.endswith("/api/widgetdata/multiline"):
+            self._trends_multiline(params)
+        elif "/trends/explore" in url.path:
+            self._send(200, b"", content_type="text/html", headers={"Set-Cookie": "NID=stub; Path=/"})
+        else:
+            self._send(404, b"{}")
+
+    def _send(self, status, body, content_type="application/json", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, payload, prefix="", headers=None):
+        self._send(200, (prefix + json.dumps(payload, default=str)).encode("utf-8"), headers=headers)
+
+    def _adzuna(self, path, params):
+        page = int(path.rstrip("/").split("/")[-1])
+        per_page = int(params.get("results_per_page", 50))
+        total = self.state.adzuna_total
+        start = (page - 1) * per_page
+        recorded = self.state.adzuna
+        results = [
+            {
+                "title": job.get("title"),
+                "company": {"display_name": job.get("company")},
+                "location": {"display_name": job.get("location")},
+                "salary_min": job.get("salary_min"),
+                "salary_max": job.get("salary_max"),
+                "description": job.get("description"),
+                "created": job.get("created"),
+            }
+            for job in (recorded[i % len(recorded)] for i in range(start, min(start + per_page, total)))
+        ]
+        self._json({"count": total, "results": results})
+
+    def _github(self, params):
+        created = next(
+            (part for part in params.get("q", "").split() if part.startswith("created:")), ""
+        )
+        try:
+            low, high = created[len("created:"):].split("..")
+            # Bornes au jour, incluses
+            start = datetime.fromisoformat(low).replace(tzinfo=timezone.utc)
+            days = (datetime.fromisoformat(high).replace(tzinfo=timezone.utc) - start).days + 1
+        except ValueError:
+            start, days = datetime.now(timezone.utc), 1
+        total = int(days * self.state.github_per_day)
+
+        page = int(params.get("page", 1))
+        per_page = int(params.get("per_page", 100))
+        offset = (page - 1) * per_page
+        recorded = self.state.github
+        items = []
+        for i in range(offset, min(offset + per_page, total, 1000)):
+            repo = recorded[i % len(recorded)]
+            items.append({
+                "name": repo.get("name"),
+                "full_name": f"{repo.get('full_name')}-{start:%Y%m%d%H%M}-{i}",
+                "owner": {"location": repo.get("owner_location")},
+                "stargazers_count": repo.get("stars"),
+                "forks_count": repo.get("forks"),
+                "created_at": repo.get("created_at"),
+                "updated_at": repo.get("updated_at"),
+                "description": repo.get("description"),
+            })
+        reset = int(time.time()) + 60
+        self._json(
+            {"total_count": total, "items": items},
+            headers={"X-RateLimit-Remaining": "30", "X-RateLimit-Reset": str(reset)},
+        )
+
+    def _trends_explore(self, params):
+        request = json.loads(params.get("req", "{}"))
+        keywords = [item["keyword"] for item in request.get("comparisonItem", [])]
+        widget = {"id": "TIMESERIES", "request": {"keywords": keywords}, "token": "stub"}
+        self._json({"widgets": [widget]}, prefix=")]}'")
+
+    def _trends_multiline(self, params):
+        keywords = json.loads(params.get("req", "{}")).get("keywords", [])
+        end = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        dates = [end - timedelta(days=offset) for offset in range(90, 0, -1)]
+        timeline = []
+        for day in dates:
+            values = []
+            for keyword in keywords:
+                recorded = self.state.trends.get(keyword)
+                if recorded:
+                    series = list(recorded.values())
+                    values.append(int(series[day.toordinal() % len(series)]))
+                else:
+                    values.append(zlib.crc32(f"{keyword}{day.date()}".encode()) % 100)
+            timeline.append({
+                "time": str(int(day.timestamp())),
+                "formattedTime": day.strftime("%b %d, %Y"),
+                "value": values,
+            })
+        self._json({"default": {"timelineData": timeline}}, prefix=")]}',")
+
+
+def start_stub_server(state):
+    handler = type("BoundStubHandler", (StubHandler,), {"state": state})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def count_records(raw_dir, name):
+    """Nombre d'enregistrements écrits par un collecteur (NDJSON, gzip ou non)"""
+    total = 0
+    for path in glob.glob(os.path.join(raw_dir, f"{name}.ndjson*")):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            total += sum(1 for line in f if line.strip())
+    return total
+
+
+def run_collector(collector, base_url, env, queue):
+    """Exécute un collecteur dans le processus courant et renvoie ses mesures"""
+    os.environ.update(env)
+    os.chdir(env["RAW_DATA_DIR"])
+    # Les sessions HTTP ne doivent pas passer par un éventuel proxy système
+    os.environ["NO_PROXY"] = "127.0.0.1"
+
+    spec = importlib.util.spec_from_file_location("scrape", os.path.join(SCRIPT_DIR, "01_scrape.py"))
+    scrape = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(scrape)
+
+    import pytrends.request
+    pytrends.request.BASE_TRENDS_URL = f"{base_url}/trends"
+    scrape.TrendReq.GENERAL_URL = f"{base_url}/trends/api/explore"
+    scrape.TrendReq.INTEREST_OVER_TIME_URL = f"{base_url}/trends/api/widgetdata/multiline"
+
+    function_name, output = COLLECTORS[collector]
+    start = time.perf_counter()
+    getattr(scrape, function_name)()
+    wall = time.perf_counter() - start
+
+    # ru_maxrss est en Ko sous Linux, en octets sous macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    queue.put({
+        "wall_s": wall,
+        "records": count_records(env["RAW_DATA_DIR"], output),
+        "peak_rss_mb": peak_mb,
+    })
+
+
+def wait_result(process, queue, timeout):
+    """Mesures envoyées par le processus du collecteur, ou None s'il s'arrête
+    (ou dépasse timeout secondes) sans les avoir envoyées"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            return queue.get(timeout=1)
+        except Empty:
+            if not process.is_alive():
+                # Mesures éventuellement envoyées juste avant la fin du processus
+                try:
+                    return queue.get(timeout=1)
+                except Empty:
+                    return None
+    process.terminate()
+    return None
+
+
+def bench(collector, state, base_url, args):
+    """Mesure un collecteur isolé dans un processus et un dossier raw/ vierges.
+
+    Un collecteur qui plante ou dépasse --timeout est renvoyé en échec (clé error).
+    """
+    with tempfile.TemporaryDirectory(prefix=f"bench_{collector}_") as tmp_dir:
+        env = {
+            "RAW_DATA_DIR": tmp_dir,
+            "SKILLS_DIM_PATH": os.path.abspath(args.skills_dim),
+            "HTTP_CACHE_MODE": "off",
+            "ADZUNA_BASE_URL": f"{base_url}/v1/api/jobs",
+            "ADZUNA_APP_ID": "bench",
+            "ADZUNA_API_KEY": "bench",
+            "ADZUNA_MAX_PAGES": str(args.adzuna_pages),
+            "GITHUB_API_URL": base_url,
+            "GITHUB_CREATED_SINCE": args.github_since,
+        }
+        for source in ("ADZUNA", "GITHUB", "TRENDS"):
+            if args.workers:
+                env[f"{source}_WORKERS"] = str(args.workers)
+            if args.rate:
+                env[f"{source}_RATE"] = str(args.rate)
+
+        state.reset()
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        process = context.Process(target=run_collector, args=(collector, base_url, env, queue))
+        process.start()
+        result = wait_result(process, queue, args.timeout)
+        process.join()
+
+    if result is None:
+        error = f"code de sortie {process.exitcode}" if process.exitcode else f"délai de {args.timeout}s dépassé"
+        return {"collector": collector, "error": error, "requests": state.requests}
+
+    result.update(collector=collector, requests=state.requests, rejected_429=state.rejected)
+    result["requests_per_s"] = result["requests"] / result["wall_s"] if result["wall_s"] else 0.0
+    result["records_per_s"] = result["records"] / result["wall_s"] if result["wall_s"] else 0.0
+    return result
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark hors ligne des collecteurs")
+    parser.add_argument("--collectors", nargs="+", choices=sorted(COLLECTORS), default=sorted(COLLECTORS))
+    parser.add_argument("--raw-dir", default=DEFAULT_RAW_DIR, help="payloads enregistrés à rejouer")
+    parser.add_argument("--skills-dim", default=os.path.join(SCRIPT_DIR, "..", "datasets_clean", "dim_skills.csv"))
+    parser.add_argument("--latency", type=float, default=0.05, help="latence par requête (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="proportion de réponses 429")
+    parser.add_argument("--adzuna-total", type=int, default=500, help="offres annoncées par couple pays/requête")
+    parser.add_argument("--adzuna-pages", type=int, default=10)
+    parser.add_argument("--github-per-day", type=float, default=5.0, help="repos créés par jour et par langage")
+    parser.add_argument("--github-since", default="2025-01-01")
+    parser.add_argument("--workers", type=int, default=0, help="surcharge le nombre de workers par source")
+    parser.add_argument("--rate", type=float, default=1000.0, help="débit par source (0 = configuration du scraper)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=600.0, help="durée maximale par collecteur (s)")
+    parser.add_argument("--json", help="écrit les résultats dans ce fichier")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    random.seed(args.seed)
+    state = StubState(args.raw_dir, args)
+    server = start_stub_server(state)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    results = []
+    try:
+        for collector in args.collectors:
+            results.append(bench(collector, state, base_url, args))
+    finally:
+        server.shutdown()
+
+    header = f"{'collecteur':<15}{'durée (s)':>11}{'requêtes':>10}{'req/s':>9}{'records':>9}{'rec/s':>10}{'429':>6}{'RSS (Mo)':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        if "error" in r:
+            print(f"{r['collector']:<15}échec : {r['error']}")
+            continue
+        print(
+            f"{r['collector']:<15}{r['wall_s']:>11.2f}{r['requests']:>10}{r['requests_per_s']:>9.1f}"
+            f"{r['records']:>9}{r['records_per_s']:>10.1f}{r['rejected_429']:>6}{r['peak_rss_mb']:>10.1f}"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if any("error" in r for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -68,6 +68,13 @@ run_full_pipeline() {
             log "   - $(basename "$file"): $lines lignes, $size"
         fi
     done
+    for dir in /Users/saad/jobtech/datasets_clean/*_clean; do
+        if [ -d "$dir" ]; then
+            size=$(du -sh "$dir" | awk '{print $1}')
+            files=$(find "$dir" -name "*.parquet" | wc -l)
+            log "   - $(basename "$dir")/: $files fichiers Parquet, $size"
+        fi
+    done
 }
 
 # Menu principal
@@ -0,0 +1,45 @@
+import os
+import importlib.util
+
+import pytest
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts")
+
+
+def load_script(filename, workdir):
+    """Importe un script numéroté de scripts/ (nom de module invalide en Python).
+
+    L'import se fait depuis workdir : les scripts créent leurs dossiers et
+    journaux relativement au répertoire courant.
+    """
+    previous = os.getcwd()
+    os.chdir(workdir)
+    try:
+        spec = importlib.util.spec_from_file_location(
+            filename.removesuffix(".py").lstrip("0123456789_"), os.path.join(SCRIPTS_DIR, filename)
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        os.chdir(previous)
+    return module
+
+
+@pytest.fixture(scope="session")
+def feeder(tmp_path_factory):
+    return load_script("02_feeder.py", tmp_path_factory.mktemp("feeder"))
+
+
+@pytest.fixture(scope="session")
+def cleaner(tmp_path_factory):
+    return load_script("03_clean_mongodb.py", tmp_path_factory.mktemp("cleaner"))
+
+
+@pytest.fixture(scope="session")
+def loader(tmp_path_factory):
+    return load_script("04_load_dwh.py", tmp_path_factory.mktemp("loader"))
+
+
+@pytest.fixture(scope="session")
+def scraper(tmp_path_factory):
+    return load_script("01_scrape.py", tmp_path_factory.mktemp("scraper"))
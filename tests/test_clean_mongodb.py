@@ -0,0 +1,202 @@
+import math
+
+import pandas as pd
+import pytest
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Salaire : 35 537,79 € par an", (35537, 35537, "EUR", "yearly")),
+    ("Rémunération : 45 000 € brut annuel", (45000, 45000, "EUR", "yearly")),
+    ("Salary: €50k - €70k per year", (50000, 70000, "EUR", "yearly")),
+    ("$89,000 to $139,000", (89000, 139000, "USD", None)),
+    ("50k€ - 70k€", (50000, 70000, "EUR", None)),
+    ("€4516 per month", (4516, 4516, "EUR", "monthly")),
+    ("2-3 years of experience with Python", (None, None, None, None)),
+])
+def test_extract_salaries(cleaner, text, expected):
+    row = cleaner.extract_salaries(pd.Series([text])).iloc[0]
+    got = tuple(None if not isinstance(value, str) and pd.isna(value) else value for value in row)
+    assert got[2:] == expected[2:]
+    for value, wanted in zip(got[:2], expected[:2]):
+        assert (value is None and wanted is None) or math.isclose(value, wanted)
+
+
+def test_to_arrow_same_schema_for_every_chunk(cleaner):
+    """Des morceaux aux valeurs différentes (entiers, décimaux, colonne vide) gardent le schéma de la sortie"""
+    schema = cleaner.output_schema("indeed_jobs_clean")
+    chunks = [
+        pd.DataFrame({"doc_id": ["a"], "min_amount": [50000], "company_industry": [float("nan")],
+                      "is_remote": [None], "skills": [["Python"]], "scraped_at": ["2026-10-01T08:00:00"]}),
+        pd.DataFrame({"doc_id": ["b"], "min_amount": [512.5], "company_industry": ["IT"],
+                      "is_remote": [True], "skills": [None], "scraped_at": [pd.Timestamp("2026-10-02", tz="UTC")]}),
+    ]
+    tables = [cleaner.to_arrow(chunk, schema) for chunk in chunks]
+    assert all(table.schema.equals(schema) for table in tables)
+    assert tables[0].column("min_amount").to_pylist() == [50000.0]
+    assert tables[0].column("company_industry").to_pylist() == [None]
+
+
+def test_survey_outputs_share_schema(cleaner):
+    assert cleaner.output_schema("stackoverflow_survey_2023_clean") is cleaner.output_schema("stackoverflow_survey_clean")
+
+
+@pytest.mark.parametrize("docs", [
+    [],
+    [{"salary_min": 40000, "salary_max": 60000}],
+    [
+        {"salary_min": 40000, "salary_max": 60000},
+        {"salary_min": 30000.5, "salary_max": None},
+        {"salary_min": 5000, "salary_max": 90000},
+        {"salary_min": math.nan, "salary_max": 70000},
+        {"salary_max": 80000},
+        {"salary_min": 55000, "salary_max": ""},
+    ],
+])
+def test_adzuna_salary_medians_match_pandas(cleaner, monkeypatch, docs):
+    """Les médianes calculées par MongoDB sont celles du filtre pandas sur toute la collection"""
+    mongomock = pytest.importorskip("mongomock")
+    db = mongomock.MongoClient()["jobtech"]
+    monkeypatch.setattr(cleaner, "get_db", lambda: db)
+    if docs:
+        db["adzuna_jobs"].insert_many([dict(doc) for doc in docs])
+
+    salaries = cleaner.filter_adzuna_salaries(pd.DataFrame(docs, columns=["salary_min", "salary_max"]))
+    expected = (salaries["salary_min"].median(), salaries["salary_max"].median())
+    for got, wanted in zip(cleaner.adzuna_salary_medians(), expected):
+        assert (math.isnan(got) and math.isnan(wanted)) or got == wanted
+
+
+@pytest.mark.parametrize("title, description, expected", [
+    ("Cloud Engineer", "Google Cloud, Go-to-market", []),
+    ("Senior Go developer", "Poste chez Google", ["Go"]),
+    ("Backend", "Golang, Rust", ["Go", "Rust"]),
+    ("Node.js backend", None, ["Node.js"]),
+    ("Java / JavaScript", "React.js", ["JavaScript", "Java", "React"]),
+    ("Pythonic rustic code", "trusted", []),
+    ("Full-Stack", "python", ["Python", "Full Stack"]),
+])
+def test_tag_skills_whole_words(cleaner, title, description, expected):
+    """Les synonymes ne sont reconnus qu'en mots entiers (« Go » n'est pas dans « Google »)"""
+    tags = cleaner.tag_skills(pd.Series([title], index=[7]), pd.Series([description], index=[7]))
+    assert tags.index.tolist() == [7]
+    assert tags.iloc[0] == expected
+
+
+def test_apply_validity_masks(cleaner):
+    """Une ligne invalide n'est comptée que pour la première règle qu'elle enfreint"""
+    df = pd.DataFrame({
+        "title": ["Dev", None, "", "Ops", "Data", "QA"],
+        "company": ["Acme", "Acme", None, "", "Acme", "Acme"],
+        "skills": [["Python"], [], ["Go"], ["Rust"], [], [""]],
+    }, index=[10, 11, 12, 13, 14, 15])
+    rejections = cleaner.Counter()
+    valid = cleaner.apply_validity(df, cleaner.VALIDITY_RULES["jobspy"], rejections)
+
+    assert valid.index.tolist() == [10]
+    # La ligne 12 (titre vide, entreprise nulle) est comptée pour not_null(company)
+    assert {rule: count for rule, count in rejections.items() if count} == {
+        "not_null(title)": 1,
+        "not_null(company)": 1,
+        "not_empty(company)": 1,
+        "not_empty_list(skills)": 2,
+    }
+
+
+def test_apply_validity_ignores_missing_columns(cleaner):
+    df = pd.DataFrame({"Country": ["France", ""], "CompTotal": [50000, 60000]})
+    rejections = cleaner.Counter()
+    valid = cleaner.apply_validity(df, cleaner.VALIDITY_RULES["stackoverflow_survey"], rejections)
+    assert valid["Country"].tolist() == ["France"]
+    assert rejections["not_empty(Country)"] == 1
+
+
+@pytest.mark.parametrize("html, expected", [
+    ("<!-- c -->", ""),
+    ("<?xml version='1.0' encoding='utf-8'?><p>Python &amp; Go</p><p>Rust</p>", "Python & Go Rust"),
+    ("<ul><li>Python</li><li>Java</li></ul><script>var x;</script>", "Python Java"),
+    (None, ""),
+])
+def test_html_to_text(cleaner, html, expected):
+    """Aucune balise ne passe dans le texte, même quand lxml rejette le document"""
+    assert cleaner.html_to_text(html) == expected
+
+
+def test_source_components_never_merge_same_source(cleaner):
+    """A–X–B : deux annonces Indeed distinctes ne fusionnent pas via une annonce Adzuna"""
+    np = cleaner.np
+    sources = np.array(["indeed", "adzuna", "indeed", "linkedin"], dtype=object)
+    left, right = np.array([0, 1, 1]), np.array([1, 2, 3])
+    similarity = np.array([0.9, 0.8, 0.75], dtype=np.float32)
+
+    labels = cleaner.source_components(left, right, similarity, sources)
+    # X rejoint A (la plus proche), B reste seule ; l'annonce LinkedIn rejoint le groupe de X
+    assert labels.tolist() == [0, 0, 2, 0]
+
+
+def test_lsh_recalls_near_duplicates(cleaner):
+    """Les quasi-doublons (une lettre changée, une mention ajoutée) deviennent des paires candidates"""
+    rng = cleaner.np.random.default_rng(3)
+    words = ["python", "java", "data", "engineer", "developer", "senior", "backend", "cloud", "lead", "analyst"]
+    bases = [
+        f"{' '.join(rng.choice(words, 3))} company{i} {rng.choice(['paris', 'berlin', 'madrid'])}"
+        for i in range(300)
+    ]
+    variants = [base.replace("a", "e", 1) if i % 2 else base + " h" for i, base in enumerate(bases)]
+    keys = pd.Series(bases + variants)
+
+    signatures = cleaner.minhash_signatures(keys)
+    left, right = cleaner.lsh_candidate_pairs(signatures)
+    candidates = set(zip(left.tolist(), right.tolist()))
+    found = sum((i, i + len(bases)) in candidates for i in range(len(bases)))
+    assert found / len(bases) >= 0.95
+    # Peu de candidats au regard des n² / 2 paires possibles
+    assert len(candidates) < len(keys) * 20
+
+
+@pytest.mark.parametrize("clean_format", ["parquet", "csv"])
+def test_incremental_clean_merges_since_watermark(cleaner, monkeypatch, tmp_path, clean_format):
+    """Un nettoyage incrémental ne relit que les documents postérieurs au watermark
+    et remplace leurs lignes dans la sortie existante"""
+    mongomock = pytest.importorskip("mongomock")
+    from datetime import datetime, timedelta
+
+    db = mongomock.MongoClient()["jobtech"]
+    monkeypatch.setattr(cleaner, "get_db", lambda: db)
+    monkeypatch.setattr(cleaner, "CLEAN_DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(cleaner, "STATE_DIR", str(tmp_path / ".state"))
+    monkeypatch.setattr(cleaner, "CLEAN_FORMAT", clean_format)
+
+    first = datetime(2025, 1, 1)
+    repos = db["github_trends"]
+    repos.insert_many([
+        {"_id": f"r{i}", "full_name": f"org/r{i}", "language": "Python", "stars": 10 * i, "forks": 0,
+         "created_at": "2024-01-01", "scraped_at": "2025-01-01", "_ingested_at": first}
+        for i in range(1, 4)
+    ])
+    cleaner.clean_github_trends()
+
+    seen = []
+    real_iter_chunks = cleaner.iter_chunks
+
+    def recording_iter_chunks(name, since=None, **kwargs):
+        for chunk in real_iter_chunks(name, since, **kwargs):
+            seen.extend(chunk[cleaner.DOC_ID])
+            yield chunk
+
+    monkeypatch.setattr(cleaner, "iter_chunks", recording_iter_chunks)
+    later = first + timedelta(days=1)
+    repos.update_one({"_id": "r2"}, {"$set": {"stars": 500, "_ingested_at": later}})
+    repos.insert_one({"_id": "r4", "full_name": "org/r4", "language": "Go", "stars": 7, "forks": 1,
+                      "created_at": "2024-02-01", "scraped_at": "2025-01-02", "_ingested_at": later})
+    cleaner.clean_github_trends()
+
+    assert sorted(seen) == ["r2", "r4"]
+    out = cleaner.read_output("github_trends_clean", [cleaner.DOC_ID, "stars"])
+    stars = dict(zip(out[cleaner.DOC_ID], pd.to_numeric(out["stars"])))
+    assert stars == {"r1": 10, "r2": 500, "r3": 30, "r4": 7}
+
+    # Rien de nouveau : aucun document relu, sortie inchangée
+    seen.clear()
+    cleaner.clean_github_trends()
+    assert seen == []
+    assert len(cleaner.read_output("github_trends_clean", [cleaner.DOC_ID])) == 4
@@ -0,0 +1,103 @@
+import io
+import json
+
+import pytest
+
+ARRAYS = [
+    [1234567, 89, True, None, 3.5e10],
+    [1.5, -0.25, 2e-3, 1E+5, -7, 0],
+    [{"title": "Dev ] Python", "salary": 35537.79, "skills": ["Go", "Rust"]}, [], {}, "a,b"],
+]
+
+
+@pytest.mark.parametrize("values", ARRAYS)
+def test_iter_json_array_any_chunk_size(feeder, values):
+    """Un élément coupé à n'importe quelle frontière de lecture est recollé avant d'être décodé"""
+    text = json.dumps(values)
+    for chunk_size in range(1, len(text) + 2):
+        assert list(feeder.iter_json_array(io.StringIO(text), chunk_size=chunk_size)) == values, chunk_size
+
+
+def test_iter_json_array_number_split_after_dot(feeder):
+    class Chunks(io.StringIO):
+        def __init__(self, parts):
+            super().__init__()
+            self.parts = list(parts)
+
+        def read(self, size=-1):
+            return self.parts.pop(0) if self.parts else ""
+
+    assert list(feeder.iter_json_array(Chunks(["[1.", "5]"]))) == [1.5]
+
+
+def test_iter_json_array_single_object(feeder):
+    assert list(feeder.iter_json_array(io.StringIO('{"id": 1}'), chunk_size=3)) == [{"id": 1}]
+
+
+def test_iter_json_array_invalid_raises(feeder):
+    with pytest.raises(json.JSONDecodeError):
+        list(feeder.iter_json_array(io.StringIO("[1.]"), chunk_size=2))
+
+
+def test_assign_ids_from_natural_key_only(feeder):
+    """L'_id ne dépend que de la clé naturelle, pas du reste du document ni du lot"""
+    alone = [{"id": "in-1", "title": "Dev"}]
+    batched = [{"id": "in-1", "title": "Dev Python", "extra": 1}, {"id": None, "title": "Ops"}]
+    feeder.assign_ids("indeed_jobs", alone)
+    feeder.assign_ids("indeed_jobs", batched)
+    assert alone[0]["_id"] == batched[0]["_id"]
+    # Clé vide : empreinte de contenu
+    assert batched[1]["_id"] == feeder.hash_record({"id": None, "title": "Ops"})
+
+
+def test_migrate_ids_merges_versions(feeder, monkeypatch):
+    mongomock = pytest.importorskip("mongomock")
+    db = mongomock.MongoClient()["jobtech"]
+    monkeypatch.setattr(feeder, "get_db", lambda: db)
+    old = {"id": "in-1", "title": "Dev", "_ingested_at": 1}
+    new = {"id": "in-1", "title": "Dev Python", "_ingested_at": 2}
+    db["indeed_jobs"].insert_many([dict(doc, _id=feeder.hash_record(doc)) for doc in (new, old)])
+
+    assert feeder.migrate_ids() == {"indeed_jobs": 2}
+    docs = list(db["indeed_jobs"].find())
+    assert len(docs) == 1
+    assert docs[0]["_id"] == feeder.natural_id(new, ["id"]) and docs[0]["title"] == "Dev Python"
+    assert feeder.migrate_ids() == {"indeed_jobs": 0}
+
+
+def test_content_hash_independent_of_batch(feeder, monkeypatch):
+    """Un document inchangé garde son empreinte quel que soit le lot qui l'accompagne"""
+    mongomock = pytest.importorskip("mongomock")
+    db = mongomock.MongoClient()["jobtech"]
+    monkeypatch.setattr(feeder, "get_db", lambda: db)
+    doc = {"id": "in-1", "title": "Dev", "min_amount": 50000.0}
+
+    feeder.insert_data("indeed_jobs", [dict(doc)])
+    counts = feeder.insert_data("indeed_jobs", [
+        dict(doc), {"id": "in-2", "title": "Ops", "min_amount": None, "extra": "x"},
+    ])
+    assert counts["inserted"] == 1 and counts["unchanged"] == 1 and counts["updated"] == 0
+
+
+def test_natural_ids_independent_of_batch_types(feeder):
+    """Une clé entière garde son _id quand le lot contient des clés absentes"""
+    alone = feeder.natural_ids([{"ResponseId": 7}], ["ResponseId"])
+    mixed = feeder.natural_ids([{"ResponseId": None}, {"ResponseId": 7}, {}], ["ResponseId"])
+    assert mixed == [None, alone[0], None]
+    # L'ordre des parties de clé compte
+    ab = feeder.natural_ids([{"title": "a", "company": ""}, {"title": "", "company": "a"}], ["title", "company"])
+    assert ab[0] != ab[1]
+
+
+def test_content_hash_only_cleaned_fields(feeder, monkeypatch):
+    """Seuls les champs lus par le nettoyage font réécrire un document"""
+    mongomock = pytest.importorskip("mongomock")
+    db = mongomock.MongoClient()["jobtech"]
+    monkeypatch.setattr(feeder, "get_db", lambda: db)
+    doc = {"id": "li-1", "title": "Dev", "company_logo": "a.png"}
+
+    feeder.insert_data("linkedin_jobs", [dict(doc)])
+    counts = feeder.insert_data("linkedin_jobs", [dict(doc, company_logo="b.png")])
+    assert counts["unchanged"] == 1 and counts["updated"] == 0
+    counts = feeder.insert_data("linkedin_jobs", [dict(doc, title="Dev Python")])
+    assert counts["updated"] == 1
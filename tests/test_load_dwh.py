@@ -0,0 +1,59 @@
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def clean_dir(loader, tmp_path, monkeypatch):
+    monkeypatch.setattr(loader, "CLEAN_DATA_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_read_clean_does_not_fall_back_to_csv(loader, clean_dir, monkeypatch):
+    """En Parquet, un ancien CSV de la même sortie n'est jamais lu à la place du jeu absent"""
+    monkeypatch.setattr(loader, "CLEAN_FORMAT", "parquet")
+    pd.DataFrame({"doc_id": ["stale"]}).to_csv(clean_dir / "indeed_jobs_clean.csv", index=False)
+    with pytest.raises(FileNotFoundError):
+        loader.read_clean("indeed_jobs_clean")
+
+
+def test_read_clean_csv_ignores_parquet(loader, clean_dir, monkeypatch):
+    monkeypatch.setattr(loader, "CLEAN_FORMAT", "csv")
+    (clean_dir / "indeed_jobs_clean").mkdir()
+    pd.DataFrame({"doc_id": ["stale"]}).to_parquet(clean_dir / "indeed_jobs_clean" / "part.parquet")
+    pd.DataFrame({"doc_id": ["fresh"], "skills": ["['Python']"]}).to_csv(clean_dir / "indeed_jobs_clean.csv", index=False)
+    df = loader.read_clean("indeed_jobs_clean")
+    assert df["doc_id"].tolist() == ["fresh"] and df["skills"].tolist() == [["Python"]]
+
+
+def test_survey_without_edition_is_skipped(loader, clean_dir):
+    """Sans édition du survey nettoyée, le chargement continue avec une table vide"""
+    conn = sqlite3.connect(":memory:")
+    loader.create_dwh_schema(conn)
+    loader.load_stackoverflow_survey(conn)
+    assert conn.execute("SELECT COUNT(*) FROM f_survey_responses").fetchone()[0] == 0
+
+
+def test_read_clean_auto_reads_shipped_csv(loader, clean_dir, monkeypatch):
+    """Dépôt fraîchement cloné : seuls les CSV d'exemple existent"""
+    monkeypatch.setattr(loader, "CLEAN_FORMAT", "auto")
+    pd.DataFrame({"doc_id": ["sample"]}).to_csv(clean_dir / "indeed_jobs_clean.csv", index=False)
+    assert loader.read_clean("indeed_jobs_clean")["doc_id"].tolist() == ["sample"]
+    with pytest.raises(FileNotFoundError):
+        loader.read_clean("linkedin_jobs_clean")
+
+
+def test_read_clean_auto_prefers_newest_format(loader, clean_dir, monkeypatch):
+    monkeypatch.setattr(loader, "CLEAN_FORMAT", "auto")
+    csv_path = clean_dir / "indeed_jobs_clean.csv"
+    pd.DataFrame({"doc_id": ["sample"]}).to_csv(csv_path, index=False)
+    (clean_dir / "indeed_jobs_clean").mkdir()
+    part = clean_dir / "indeed_jobs_clean" / "part.parquet"
+    pd.DataFrame({"doc_id": ["cleaned"]}).to_parquet(part)
+
+    os.utime(csv_path, (1_000, 1_000))
+    assert loader.read_clean("indeed_jobs_clean")["doc_id"].tolist() == ["cleaned"]
+    os.utime(part, (500, 500))
+    assert loader.read_clean("indeed_jobs_clean")["doc_id"].tolist() == ["sample"]
@@ -0,0 +1,124 @@
+from email.utils import format_datetime
+from datetime import datetime, timezone
+
+import pytest
+
+
+class FakeClock:
+    """Horloge simulée : sleep avance le temps au lieu d'attendre"""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(scraper, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(scraper, "time", clock)
+    return clock
+
+
+def test_rate_limiter_burst_then_refill(scraper, clock):
+    limiter = scraper.RateLimiter("test", rate=2, burst=2)
+    limiter.acquire()
+    limiter.acquire()
+    assert clock.sleeps == []
+    # Seau vide : un jeton revient en 1 / rate secondes
+    limiter.acquire()
+    assert clock.sleeps == [pytest.approx(0.5)]
+    # Une longue pause ne remplit pas le seau au-delà de sa capacité
+    clock.now += 60
+    for _ in range(3):
+        limiter.acquire()
+    assert clock.sleeps == [pytest.approx(0.5), pytest.approx(0.5)]
+
+
+def test_rate_limiter_block_for(scraper, clock):
+    limiter = scraper.RateLimiter("test", rate=4, burst=5)
+    limiter.block_for(30)
+    limiter.acquire()
+    # Le seau repart vide : premier jeton 1 / rate secondes après la fin de la pause
+    assert clock.sleeps == [pytest.approx(30), pytest.approx(0.25)]
+
+
+def test_wait_from_retry_after(scraper, clock):
+    limiter = scraper.RateLimiter("test", rate=1)
+    assert limiter.wait_from_headers({"Retry-After": "12"}) == 12
+    retry_at = datetime.fromtimestamp(clock.now + 90, tz=timezone.utc)
+    assert limiter.wait_from_headers({"Retry-After": format_datetime(retry_at, usegmt=True)}) == pytest.approx(90)
+    assert limiter.wait_from_headers({"Retry-After": "bientôt"}) is None
+
+
+def test_wait_from_rate_limit_headers(scraper, clock):
+    limiter = scraper.RateLimiter("test", rate=1)
+    reset = str(int(clock.now) + 30)
+    assert limiter.wait_from_headers({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset}) == pytest.approx(31)
+    # Quota restant : pas d'attente imposée
+    assert limiter.wait_from_headers({"X-RateLimit-Remaining": "3", "X-RateLimit-Reset": reset}) is None
+    assert limiter.wait_from_headers({}) is None
+
+
+def make_response(scraper, status, content=b"", headers=None, url="https://api.test/items"):
+    response = scraper.requests.Response()
+    response.status_code = status
+    response._content = content
+    response.headers = scraper.CaseInsensitiveDict(headers or {})
+    response.url = url
+    return response
+
+
+def test_http_get_revalidates_with_etag(scraper, clock, tmp_path, monkeypatch):
+    cache = scraper.HttpCache(str(tmp_path), ttl=60, max_bytes=1 << 20)
+    monkeypatch.setattr(scraper, "HTTP_CACHE", cache)
+    monkeypatch.setattr(scraper, "HTTP_CACHE_MODE", "on")
+    sent = []
+    replies = [
+        make_response(scraper, 200, b'{"v": 1}', {"ETag": '"abc"', "Content-Type": "application/json"}),
+        make_response(scraper, 304, headers={"ETag": '"abc"'}),
+    ]
+
+    def fake_request(source, method, url, params=None, headers=None, **kwargs):
+        sent.append(headers)
+        return replies.pop(0)
+
+    monkeypatch.setattr(scraper, "request_with_retry", fake_request)
+    url, params = "https://api.test/items", {"page": 1}
+
+    assert scraper.http_get("github", url, params=params).json() == {"v": 1}
+    # Entrée fraîche : servie sans requête
+    assert scraper.http_get("github", url, params=params).headers["X-Cache"] == "HIT"
+    assert len(sent) == 1
+
+    # TTL dépassé : requête conditionnelle, le 304 réutilise le corps en cache
+    clock.now += 120
+    response = scraper.http_get("github", url, params=params)
+    assert sent[1]["If-None-Match"] == '"abc"'
+    assert response.status_code == 200 and response.json() == {"v": 1}
+    # La revalidation repart pour un TTL complet
+    assert cache.is_fresh(cache.get(cache.key(url, params)))
+
+
+def test_http_cache_evicts_least_recently_used(scraper, clock, tmp_path):
+    cache = scraper.HttpCache(str(tmp_path), ttl=60, max_bytes=25)
+    for name in ("a", "b"):
+        cache.put(name, f"https://api.test/{name}", make_response(scraper, 200, b"x" * 10))
+        clock.now += 1
+    # Lire « a » le rend plus récent que « b »
+    cache.read("a")
+    clock.now += 1
+    cache.put("c", "https://api.test/c", make_response(scraper, 200, b"x" * 10))
+
+    assert cache.get("b") is None
+    assert not (tmp_path / "b.body").exists()
+    assert cache.get("a") is not None and cache.get("c") is not None